@@ -4,31 +4,201 @@ AI内容生成器
 """
 
 import asyncio
+import hashlib
 import logging
 import json
-from typing import Dict, Optional, List
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, List, Tuple
 from pathlib import Path
 
+from src.utils.ai_common import get_semaphore, get_shared_client, is_whole_word
 from src.utils.logger import get_logger
 
+try:
+    import ahocorasick
+except ImportError:  # 可选依赖，缺失时回退到预编译正则
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时使用标准库json
+    orjson = None
+
 logger = get_logger(__name__)
 
+# 求职信生成的静态指令（作为可缓存的system块，放在动态内容之前）
+_COVER_LETTER_SYSTEM_PROMPT = (
+    "你是专业求职顾问，请根据职位与候选人信息撰写个性化求职信：300-500字；"
+    "突出最匹配的技能与经验；体现对公司和行业的了解；语气专业而热情；"
+    "包含具体价值主张，避免模板化；正式商务信函格式，"
+    "以\"Dear Hiring Manager\"或\"Dear [公司名称] Team\"开头，以专业结束语和签名结尾。"
+)
+
+# 求职信提示的动态部分模板，调用时只做占位符替换
+_COVER_PROMPT_TMPL = """**职位信息：**
+- 公司: {company}
+- 职位: {position}
+- 职位描述: {jd}
+
+**候选人信息：**
+{resume}
+
+请生成求职信内容：
+"""
+
+# 关键词优化的静态指令
+_KEYWORD_SYSTEM_PROMPT = """Please optimize the provided content to improve ATS (Applicant Tracking System) compatibility based on the given job posting.
+
+Instructions:
+1. Identify key skills, technologies, and qualifications mentioned in the job posting
+2. Naturally incorporate these keywords into the content without keyword stuffing
+3. Maintain readability and professional tone
+4. Ensure all added keywords are relevant and truthful
+5. Return only the optimized content"""
+
+# 常见技能关键词
+_SKILL_KEYWORDS = (
+    'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'SQL', 'AWS',
+    'Docker', 'Kubernetes', 'Machine Learning', 'Data Analysis',
+    'Project Management', 'Agile', 'Scrum', 'Git', 'API', 'REST',
+    'Microservices', 'Cloud', 'DevOps', 'CI/CD', 'Testing'
+)
+
+# 公司特色关键词
+_COMPANY_KEYWORDS = (
+    "innovative", "leading", "growth", "cutting-edge", "industry leader",
+    "market leader", "technology", "collaborative", "dynamic", "fast-paced"
+)
+
+def _alternation(words) -> str:
+    """构建正则交替式，长词优先以免被其前缀抢先匹配"""
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+# 预编译的关键词正则：一次扫描匹配全部关键词
+_SKILL_DISPLAY = {skill.lower(): skill for skill in _SKILL_KEYWORDS}
+# 技能只匹配完整单词（"javascript" 不命中 "Java"），与自动机路径规则一致
+_SKILL_RE = re.compile(r'(?<!\w)(?:' + _alternation(_SKILL_KEYWORDS) + r')(?!\w)', re.IGNORECASE)
+_COMPANY_RE = re.compile(_alternation(_COMPANY_KEYWORDS), re.IGNORECASE)
+_TECH_RE = re.compile(r'\b(?:Python|Java|JavaScript|React|SQL|AWS|Docker|Kubernetes|Git|Agile|Scrum|Machine Learning|AI|Data Science|API|REST|GraphQL|MongoDB|PostgreSQL|Redis|Linux|CI/CD|DevOps)\b', re.IGNORECASE)
+_SOFT_RE = re.compile(r'\b(?:leadership|communication|teamwork|problem-solving|analytical|creative|detail-oriented|self-motivated|adaptable|collaborative)\b', re.IGNORECASE)
+
+# 模板占位符 {name}
+_VAR_RE = re.compile(r'\{(\w+)\}')
+
+def _mask_names(text: str, names: Dict[str, str]) -> str:
+    """把公司名、职位名等替换为 {占位符}，使仅名称不同的请求可以共用缓存"""
+    placeholders = {value: "{" + key + "}" for key, value in names.items() if value}
+    if not placeholders:
+        return text
+    # 只替换完整单词，长名称优先，避免职位名中包含公司名时被提前替换
+    pattern = re.compile(r'(?<!\w)(?:' + _alternation(placeholders) + r')(?!\w)')
+    return pattern.sub(lambda m: placeholders[m.group(0)], text)
+
+def _unmask_names(text: str, names: Dict[str, str]) -> str:
+    """把占位符替换回实际名称，未知占位符保持原样"""
+    return _VAR_RE.sub(lambda m: names.get(m.group(1), m.group(0)), text)
+
+def _build_automaton(words):
+    """构建Aho-Corasick自动机，单次扫描即可命中全部关键词"""
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word.lower(), word)
+    automaton.make_automaton()
+    return automaton
+
+_SKILL_AC = _build_automaton(_SKILL_KEYWORDS) if ahocorasick else None
+_COMPANY_AC = _build_automaton(_COMPANY_KEYWORDS) if ahocorasick else None
+
+# 模板文件缓存：路径 -> (mtime_ns, 模板数据)，文件修改后自动重新加载
+_templates_cache: Dict[str, Tuple[int, Dict]] = {}
+
+def _read_json_file(path: Path) -> Dict:
+    """同步读取JSON文件（在工作线程中调用）"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# 问题回答失败时的默认回答
+_DEFAULT_ANSWER = "I am excited about this opportunity and believe my skills align well with your requirements."
+
+# 模板无法归类问题时的通用回答
+_GENERIC_TEMPLATE_ANSWER = "Yes, I believe my background and enthusiasm make me well-suited for this position."
+
+# 常见问题模板：(类别, 关键词, 回答)，靠前的类别优先
+_QUESTION_TEMPLATES = (
+    ("salary", ("salary", "compensation", "pay"),
+     "I am open to discussing competitive compensation that reflects the market rate and my experience level."),
+    ("start", ("start", "available", "notice"),
+     "I am available to start within 2-4 weeks, allowing for proper transition of my current responsibilities."),
+    ("why", ("why", "interested", "motivate"),
+     "I am interested in this role because it aligns with my career goals and offers opportunities to apply my skills in a meaningful way."),
+    ("experience", ("experience", "years"),
+     "I have relevant experience that directly applies to this position and am excited to contribute to your team."),
+    ("relocate", ("relocate", "move", "location"),
+     "I am open to discussing relocation options and am flexible regarding location for the right opportunity."),
+)
+_Q_CAT_RE = re.compile('|'.join(
+    f"(?P<{category}>{_alternation(keywords)})" for category, keywords, _ in _QUESTION_TEMPLATES
+))
+_Q_ANSWERS = {category: answer for category, _, answer in _QUESTION_TEMPLATES}
+_Q_PRIORITY = {category: i for i, (category, _, _) in enumerate(_QUESTION_TEMPLATES)}
+
+# 职位标题关键词 -> 领域，靠前的关键词优先
+_FIELD_MAP = {
+    'software': 'software development',
+    'developer': 'software development',
+    'engineer': 'engineering',
+    'data': 'data science',
+    'analyst': 'data analysis',
+    'scientist': 'data science',
+    'manager': 'management',
+    'designer': 'design',
+    'marketing': 'marketing',
+    'sales': 'sales',
+    'product': 'product management'
+}
+_FIELD_RE = re.compile(_alternation(_FIELD_MAP))
+_FIELD_PRIORITY = {keyword: i for i, keyword in enumerate(_FIELD_MAP)}
+
+def _cached_system_block(text: str) -> List[Dict]:
+    """构建启用Anthropic提示缓存的system块"""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
 class ContentGenerator:
     """AI驱动的内容生成器"""
 
+    # AI响应缓存（LRU + TTL），所有实例共享
+    _resp_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
     def __init__(self, ai_config: Dict):
         self.config = ai_config
+        self._provider: Optional[str] = None
+        self._cache_ttl = self.config.get('cache_ttl', 3600)
+        self._cache_maxsize = self.config.get('cache_maxsize', 256)
+        # 提供商调用入口，初始化客户端时绑定，避免每次调用判断客户端类型
+        self._invoke = None
+        self._invoke_stream = None
         self.client = self._initialize_ai_client()
 
     def _initialize_ai_client(self):
-        """初始化AI客户端"""
+        """初始化AI客户端（异步SDK，避免阻塞事件循环）"""
         try:
+            max_retries = self.config.get('max_retries', 5)
             if self.config.get('anthropic_api_key'):
-                import anthropic
-                return anthropic.Anthropic(api_key=self.config['anthropic_api_key'])
+                self._provider = 'anthropic'
+                self._invoke = self._invoke_anthropic
+                self._invoke_stream = self._stream_anthropic
+                return get_shared_client('anthropic', self.config['anthropic_api_key'], max_retries)
             elif self.config.get('openai_api_key'):
-                import openai
-                return openai.OpenAI(api_key=self.config['openai_api_key'])
+                self._provider = 'openai'
+                self._invoke = self._invoke_openai
+                self._invoke_stream = self._stream_openai
+                return get_shared_client('openai', self.config['openai_api_key'], max_retries)
             else:
                 logger.warning("未配置AI API密钥，将使用模板生成")
                 return None
@@ -36,6 +206,105 @@ class ContentGenerator:
             logger.error(f"AI库导入失败: {e}")
             return None
 
+    async def aclose(self):
+        """释放对共享客户端的引用（连接池在服务器退出时统一关闭）"""
+        self.client = None
+
+    def _fast_model(self) -> Optional[str]:
+        """简单任务（如申请问题回答）使用的轻量模型，未配置时回退到默认模型"""
+        return self.config.get('fast_model') or None
+
+    def _provider_limit(self) -> asyncio.Semaphore:
+        """所有API调用共享的并发限制"""
+        return get_semaphore('provider', self.config.get('concurrency', 8))
+
+    async def _invoke_anthropic(self, prompt: str, max_tokens: int, temperature: float,
+                                system: Optional[str] = None, model: Optional[str] = None) -> str:
+        """调用Claude API并返回文本"""
+        kwargs = {"system": _cached_system_block(system)} if system else {}
+        async with self._provider_limit():
+            message = await self.client.messages.create(
+                model=model or self.config.get('default_model', 'claude-3-sonnet-20240229'),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            )
+        return message.content[0].text
+
+    async def _invoke_openai(self, prompt: str, max_tokens: int, temperature: float,
+                             system: Optional[str] = None, model: Optional[str] = None) -> str:
+        """调用OpenAI API并返回文本"""
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        async with self._provider_limit():
+            response = await self.client.chat.completions.create(
+                model=model or self.config.get('default_model', 'gpt-3.5-turbo'),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=messages
+            )
+        return response.choices[0].message.content
+
+    async def _stream_anthropic(self, prompt: str, max_tokens: int, temperature: float,
+                                system: Optional[str] = None) -> AsyncIterator[str]:
+        """以流式方式调用Claude API"""
+        kwargs = {"system": _cached_system_block(system)} if system else {}
+        async with self._provider_limit(), self.client.messages.stream(
+            model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def _stream_openai(self, prompt: str, max_tokens: int, temperature: float,
+                             system: Optional[str] = None) -> AsyncIterator[str]:
+        """以流式方式调用OpenAI API"""
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        async with self._provider_limit():
+            stream = await self.client.chat.completions.create(
+                model=self.config.get('default_model', 'gpt-3.5-turbo'),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=messages,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def _cache_key(self, *parts: str) -> str:
+        """根据提示内容计算缓存键"""
+        raw = "\x00".join((self._provider or "", *parts))
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """读取未过期的缓存响应"""
+        entry = self._resp_cache.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._resp_cache.pop(key, None)
+            return None
+
+        self._resp_cache.move_to_end(key)
+        return value
+
+    def _cache_set(self, key: str, value: str):
+        """写入缓存响应，超出容量时淘汰最久未使用的条目"""
+        self._resp_cache[key] = (time.monotonic() + self._cache_ttl, value)
+        self._resp_cache.move_to_end(key)
+        while len(self._resp_cache) > self._cache_maxsize:
+            self._resp_cache.popitem(last=False)
+
     async def generate_cover_letter(
         self,
         job_description: str,
@@ -79,72 +348,66 @@ class ContentGenerator:
     ) -> str:
         """使用AI生成求职信"""
         try:
-            prompt = self._build_cover_letter_prompt(
-                job_description, company_name, position_title, resume_summary
-            )
-
-            if 'anthropic' in str(type(self.client)):
-                # Claude API
-                message = self.client.messages.create(
-                    model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
-                    max_tokens=self.config.get('max_tokens', 1000),
-                    temperature=self.config.get('temperature', 0.7),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return message.content[0].text
-
-            elif 'openai' in str(type(self.client)):
-                # OpenAI API
-                response = self.client.chat.completions.create(
-                    model=self.config.get('default_model', 'gpt-3.5-turbo'),
-                    max_tokens=self.config.get('max_tokens', 1000),
-                    temperature=self.config.get('temperature', 0.7),
-                    messages=[{"role": "user", "content": prompt}]
+            parts = [
+                text async for text in self._stream_ai_cover_letter(
+                    job_description, company_name, position_title, resume_summary
                 )
-                return response.choices[0].message.content
-
-            else:
-                raise Exception("未知的AI客户端类型")
+            ]
+            return "".join(parts)
 
         except Exception as e:
             logger.error(f"AI生成求职信失败: {e}")
             raise
 
-    def _build_cover_letter_prompt(
+    async def _stream_ai_cover_letter(
         self,
         job_description: str,
         company_name: str,
         position_title: str,
         resume_summary: str
-    ) -> str:
-        """构建求职信生成提示"""
-        prompt = f"""
-作为一名专业的求职顾问，请为以下职位生成一份个性化的求职信：
-
-**职位信息：**
-- 公司: {company_name}
-- 职位: {position_title}
-- 职位描述: {job_description[:1500]}...
-
-**候选人信息：**
-{resume_summary if resume_summary else "请根据职位要求突出相关技能和经验"}
-
-**要求：**
-1. 求职信长度控制在300-500字
-2. 突出与职位要求最匹配的技能和经验
-3. 体现对公司和行业的了解
-4. 语气专业但不失热情
-5. 包含具体的价值主张
-6. 避免过于模板化的表达
+    ) -> AsyncIterator[str]:
+        """以流式方式调用AI生成求职信，逐段产出文本"""
+        prompt = self._build_cover_letter_prompt(
+            job_description, company_name, position_title, resume_summary
+        )
 
-**格式：**
-- 使用正式的商务信函格式
-- 开头："Dear Hiring Manager" 或 "Dear {company_name} Team"
-- 结尾：专业的结束语和签名
+        # 生成式缓存：公司名/职位名替换为占位符并归一化空白后作为键，
+        # 同一职位描述投递不同公司时复用已生成的求职信，命中后再代入新名称
+        names = {"company": company_name, "position": position_title}
+        masked_prompt = " ".join(_mask_names(prompt, names).split())
+        cache_key = self._cache_key('cover_letter', self.config.get('default_model', ''), masked_prompt)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield _unmask_names(cached, names)
+            return
+
+        parts = []
+
+        async for text in self._invoke_stream(
+            prompt,
+            max_tokens=self.config.get('cover_letter_max_tokens', 600),
+            temperature=self.config.get('temperature', 0.7),
+            system=_COVER_LETTER_SYSTEM_PROMPT
+        ):
+            parts.append(text)
+            yield text
+
+        self._cache_set(cache_key, _mask_names("".join(parts), names))
 
-请生成求职信内容：
-"""
-        return prompt
+    def _build_cover_letter_prompt(
+        self,
+        job_description: str,
+        company_name: str,
+        position_title: str,
+        resume_summary: str
+    ) -> str:
+        """构建求职信生成提示（仅包含动态部分，静态指令见 _COVER_LETTER_SYSTEM_PROMPT）"""
+        return _COVER_PROMPT_TMPL.format(
+            company=company_name,
+            position=position_title,
+            jd=job_description[:1500],
+            resume=resume_summary or "请根据职位要求突出相关技能和经验"
+        )
 
     async def _generate_template_cover_letter(
         self,
@@ -165,9 +428,10 @@ class ContentGenerator:
             template_data = templates[template_type]
             template = template_data["template"]
 
-            # 提取关键信息
-            key_skills = self._extract_key_skills(job_description)
-            company_strengths = self._extract_company_info(job_description)
+            # 提取关键信息（只做一次小写转换，两个提取器共用）
+            job_desc_lower = job_description.lower()
+            key_skills = self._extract_key_skills(job_desc_lower)
+            company_strengths = self._extract_company_info(job_desc_lower)
 
             # 填充模板变量
             variables = {
@@ -181,24 +445,29 @@ class ContentGenerator:
                 "candidate_name": "[Your Name]"
             }
 
-            # 应用变量替换
-            cover_letter = template
-            for key, value in variables.items():
-                cover_letter = cover_letter.replace(f"{{{key}}}", str(value))
-
-            return cover_letter
+            # 应用变量替换（单次扫描，未知占位符保持原样）
+            return _VAR_RE.sub(
+                lambda m: str(variables[m.group(1)]) if m.group(1) in variables else m.group(0),
+                template
+            )
 
         except Exception as e:
             logger.error(f"模板生成求职信失败: {e}")
             return await self._generate_fallback_cover_letter(company_name, position_title)
 
     async def _load_cover_letter_templates(self) -> Dict:
-        """加载求职信模板"""
+        """加载求职信模板（按文件mtime缓存，文件读取不阻塞事件循环）"""
         try:
             templates_path = Path("templates/cover_letter_templates.json")
             if templates_path.exists():
-                with open(templates_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                mtime_ns = templates_path.stat().st_mtime_ns
+                cached = _templates_cache.get(str(templates_path))
+                if cached and cached[0] == mtime_ns:
+                    return cached[1]
+
+                templates = await asyncio.to_thread(_read_json_file, templates_path)
+                _templates_cache[str(templates_path)] = (mtime_ns, templates)
+                return templates
         except Exception as e:
             logger.warning(f"加载模板失败: {e}")
 
@@ -220,62 +489,36 @@ Best regards,
             }
         }
 
-    def _extract_key_skills(self, job_description: str) -> List[str]:
-        """从职位描述中提取关键技能"""
-        # 常见技能关键词
-        skill_keywords = [
-            'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'SQL', 'AWS',
-            'Docker', 'Kubernetes', 'Machine Learning', 'Data Analysis',
-            'Project Management', 'Agile', 'Scrum', 'Git', 'API', 'REST',
-            'Microservices', 'Cloud', 'DevOps', 'CI/CD', 'Testing'
-        ]
-
-        found_skills = []
-        job_desc_lower = job_description.lower()
-
-        for skill in skill_keywords:
-            if skill.lower() in job_desc_lower:
-                found_skills.append(skill)
-
-        return found_skills[:10]  # 返回前10个技能
-
-    def _extract_company_info(self, job_description: str) -> List[str]:
-        """提取公司特色信息"""
-        company_keywords = [
-            "innovative", "leading", "growth", "cutting-edge", "industry leader",
-            "market leader", "technology", "collaborative", "dynamic", "fast-paced"
-        ]
+    def _extract_key_skills(self, job_desc_lower: str) -> List[str]:
+        """从职位描述（已转小写）中提取关键技能"""
+        # 单次扫描，只保留完整单词命中，dict.fromkeys按出现顺序去重
+        if _SKILL_AC is not None:
+            matches = (
+                skill for end, skill in _SKILL_AC.iter(job_desc_lower)
+                if is_whole_word(job_desc_lower, end - len(skill) + 1, end + 1)
+            )
+        else:
+            matches = (_SKILL_DISPLAY[match] for match in _SKILL_RE.findall(job_desc_lower))
 
-        found_info = []
-        job_desc_lower = job_description.lower()
+        found_skills = dict.fromkeys(matches)
+        return list(found_skills)[:10]  # 返回前10个技能
 
-        for keyword in company_keywords:
-            if keyword in job_desc_lower:
-                found_info.append(keyword)
+    def _extract_company_info(self, job_desc_lower: str) -> List[str]:
+        """从职位描述（已转小写）中提取公司特色信息"""
+        if _COMPANY_AC is not None:
+            matches = (keyword for _, keyword in _COMPANY_AC.iter(job_desc_lower))
+        else:
+            matches = _COMPANY_RE.findall(job_desc_lower)
 
+        found_info = list(dict.fromkeys(matches))
         return found_info if found_info else ["innovative approach"]
 
     def _infer_field(self, position_title: str) -> str:
         """根据职位标题推断领域"""
-        title_lower = position_title.lower()
-
-        field_mapping = {
-            'software': 'software development',
-            'developer': 'software development',
-            'engineer': 'engineering',
-            'data': 'data science',
-            'analyst': 'data analysis',
-            'scientist': 'data science',
-            'manager': 'management',
-            'designer': 'design',
-            'marketing': 'marketing',
-            'sales': 'sales',
-            'product': 'product management'
-        }
-
-        for keyword, field in field_mapping.items():
-            if keyword in title_lower:
-                return field
+        # 一次扫描取出全部命中，按映射表顺序取优先级最高的领域
+        matches = _FIELD_RE.findall(position_title.lower())
+        if matches:
+            return _FIELD_MAP[min(matches, key=_FIELD_PRIORITY.__getitem__)]
 
         return "technology"
 
@@ -306,14 +549,7 @@ Best regards,
 
     async def generate_email_subject(self, position_title: str, company_name: str) -> str:
         """生成邮件主题"""
-        subjects = [
-            f"Application for {position_title} - [Your Name]",
-            f"Interest in {position_title} Position at {company_name}",
-            f"{position_title} Application - Experienced Professional",
-            f"Enthusiastic {position_title} Candidate - [Your Name]"
-        ]
-
-        return subjects[0]  # 返回第一个作为默认
+        return f"Application for {position_title} - [Your Name]"
 
     async def optimize_for_platform(self, content: str, platform: str) -> str:
         """针对平台优化内容"""
@@ -337,34 +573,30 @@ Best regards,
     async def optimize_keywords(self, content: str, job_posting: str, content_type: str = "resume") -> str:
         """优化关键词以提高ATS通过率"""
         try:
-            if self.ai_client:
-                prompt = f"""
-                Please optimize the following {content_type} content to improve ATS (Applicant Tracking System) compatibility based on this job posting.
+            if self._invoke:
+                # 静态指令走缓存的system块，这里只发送动态内容
+                prompt = f"""Job Posting:
+{job_posting}
 
-                Job Posting:
-                {job_posting}
+Current {content_type.title()}:
+{content}
 
-                Current {content_type.title()}:
-                {content}
+Optimized {content_type.title()}:"""
 
-                Instructions:
-                1. Identify key skills, technologies, and qualifications mentioned in the job posting
-                2. Naturally incorporate these keywords into the {content_type} without keyword stuffing
-                3. Maintain readability and professional tone
-                4. Ensure all added keywords are relevant and truthful
-                5. Return only the optimized content
+                cache_key = self._cache_key('keywords', self.config.get('default_model', ''), prompt)
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    return cached
 
-                Optimized {content_type.title()}:
-                """
-
-                response = await self.ai_client.messages.create(
-                    model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
+                response = await self._invoke(
+                    prompt,
                     max_tokens=self.config.get('max_tokens', 2000),
                     temperature=self.config.get('temperature', 0.3),
-                    messages=[{"role": "user", "content": prompt}]
+                    system=_KEYWORD_SYSTEM_PROMPT
                 )
 
-                optimized_content = response.content[0].text.strip()
+                optimized_content = response.strip()
+                self._cache_set(cache_key, optimized_content)
                 logger.info(f"关键词优化完成 - {content_type}")
                 return optimized_content
 
@@ -380,13 +612,8 @@ Best regards,
         """基础关键词优化（无AI时的备选方案）"""
         try:
             # 提取职位要求中的关键词
-            import re
-
-            # 常见技能关键词
-            tech_keywords = re.findall(r'\b(?:Python|Java|JavaScript|React|SQL|AWS|Docker|Kubernetes|Git|Agile|Scrum|Machine Learning|AI|Data Science|API|REST|GraphQL|MongoDB|PostgreSQL|Redis|Linux|CI/CD|DevOps)\b', job_posting, re.IGNORECASE)
-
-            # 软技能关键词
-            soft_keywords = re.findall(r'\b(?:leadership|communication|teamwork|problem-solving|analytical|creative|detail-oriented|self-motivated|adaptable|collaborative)\b', job_posting, re.IGNORECASE)
+            tech_keywords = _TECH_RE.findall(job_posting)
+            soft_keywords = _SOFT_RE.findall(job_posting)
 
             # 去重并转换为小写
             all_keywords = list(set([kw.lower() for kw in tech_keywords + soft_keywords]))
@@ -413,10 +640,14 @@ Best regards,
     async def generate_question_answers(self, questions: List[str], job_context: str = "", user_profile: str = "") -> List[str]:
         """生成申请问题的智能回答"""
         try:
-            answers = []
+            # 先用模板归类常见问题（薪资、入职时间、搬迁等），无需调用AI
+            answers = [await self._get_template_answer(question) for question in questions]
+
+            if self._invoke:
+                # 只有模板无法归类的问题才发给AI，同时在途的API调用数由全局信号量限制
+                pending = [i for i, answer in enumerate(answers) if answer == _GENERIC_TEMPLATE_ANSWER]
 
-            for question in questions:
-                if self.ai_client:
+                async def answer_one(question: str) -> str:
                     prompt = f"""
                     Please provide a professional and appropriate answer to this job application question.
 
@@ -434,50 +665,43 @@ Best regards,
                     Answer:
                     """
 
-                    response = await self.ai_client.messages.create(
-                        model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
+                    response = await self._invoke(
+                        prompt,
                         max_tokens=500,
                         temperature=0.7,
-                        messages=[{"role": "user", "content": prompt}]
+                        model=self._fast_model()
                     )
 
-                    answer = response.content[0].text.strip()
-                    answers.append(answer)
+                    return response.strip()
 
-                else:
-                    # 使用模板回答
-                    answer = await self._get_template_answer(question)
-                    answers.append(answer)
+                # gather保持输入顺序，单个失败时使用默认回答
+                results = await asyncio.gather(
+                    *(answer_one(questions[i]) for i in pending),
+                    return_exceptions=True
+                )
+
+                for i, result in zip(pending, results):
+                    if isinstance(result, Exception):
+                        logger.warning(f"问题回答生成失败，使用默认回答: {result}")
+                        answers[i] = _DEFAULT_ANSWER
+                    else:
+                        answers[i] = result
 
             logger.info(f"生成问题回答: {len(answers)} 个")
             return answers
 
         except Exception as e:
             logger.error(f"生成问题回答失败: {e}")
-            return ["I am excited about this opportunity and believe my skills align well with your requirements." for _ in questions]
+            return [_DEFAULT_ANSWER for _ in questions]
 
     async def _get_template_answer(self, question: str) -> str:
         """获取模板化回答"""
-        question_lower = question.lower()
-
-        # 常见问题模板
-        if any(keyword in question_lower for keyword in ['salary', 'compensation', 'pay']):
-            return "I am open to discussing competitive compensation that reflects the market rate and my experience level."
-
-        elif any(keyword in question_lower for keyword in ['start', 'available', 'notice']):
-            return "I am available to start within 2-4 weeks, allowing for proper transition of my current responsibilities."
+        # 一次扫描，按分组名查表；多类命中时取 _QUESTION_TEMPLATES 中靠前的类别
+        categories = [m.lastgroup for m in _Q_CAT_RE.finditer(question.lower())]
+        if categories:
+            return _Q_ANSWERS[min(categories, key=_Q_PRIORITY.__getitem__)]
 
-        elif any(keyword in question_lower for keyword in ['why', 'interested', 'motivate']):
-            return "I am interested in this role because it aligns with my career goals and offers opportunities to apply my skills in a meaningful way."
-
-        elif any(keyword in question_lower for keyword in ['experience', 'years']):
-            return "I have relevant experience that directly applies to this position and am excited to contribute to your team."
-
-        elif any(keyword in question_lower for keyword in ['relocate', 'move', 'location']):
-            return "I am open to discussing relocation options and am flexible regarding location for the right opportunity."
-
-        else:
-            return "Yes, I believe my background and enthusiasm make me well-suited for this position."
+        return _GENERIC_TEMPLATE_ANSWER
 
 if __name__ == "__main__":
     async def test_content_generator():
@@ -4,20 +4,187 @@
 """
 
 import asyncio
+import functools
 import logging
 import re
-from typing import Dict, List, Optional, Tuple
+from collections import Counter, namedtuple
+from typing import Dict, List, Optional, Set, Tuple
 from pathlib import Path
 
+from src.utils.ai_common import find_word, get_semaphore, get_shared_client, is_whole_word
 from src.utils.logger import get_logger
 
+try:
+    import ahocorasick
+except ImportError:  # 可选依赖，缺失时回退到逐个子串查找
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
+# 技能词表：类别 -> 技能（展示名）
+_SKILL_VOCABULARY = {
+    # 编程语言
+    'programming_languages': ('Python', 'JavaScript', 'Java', 'C++', 'C#', 'Go', 'Rust', 'PHP', 'Ruby', 'Scala', 'Kotlin', 'Swift', 'TypeScript'),
+    # 框架
+    'frameworks': ('React', 'Vue', 'Angular', 'Django', 'Flask', 'Spring', 'Express', 'Laravel', 'Rails', 'ASP.NET'),
+    # 工具
+    'tools': ('Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Git', 'Jenkins', 'Terraform', 'Ansible'),
+    # 数据库
+    'databases': ('MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch', 'Oracle', 'SQL Server'),
+    # 软技能
+    'soft_skills': ('leadership', 'communication', 'teamwork', 'problem solving', 'analytical', 'creative'),
+}
+
+# 小写技能 -> 展示名
+_SKILL_DISPLAY = {skill.lower(): skill for skills in _SKILL_VOCABULARY.values() for skill in skills}
+
+# 类别 -> ((小写技能, 展示名), ...)，保持词表顺序
+_SKILL_VOCABULARY_LOWER = {
+    category: tuple((skill.lower(), skill) for skill in skills)
+    for category, skills in _SKILL_VOCABULARY.items()
+}
+
+# 常见别名/缩写 -> 标准技能名（小写），弥补纯子串匹配对 "Postgres"、"K8s" 等写法的漏检
+_SKILL_ALIASES = {
+    'golang': 'go',
+    'js': 'javascript',
+    'cpp': 'c++',
+    'c sharp': 'c#',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'spring boot': 'spring',
+    'express.js': 'express',
+    'ruby on rails': 'rails',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'elastic search': 'elasticsearch',
+    'mssql': 'sql server',
+    'problem-solving': 'problem solving',
+}
+
+# 标准技能名（小写） -> 类别
+_SKILL_CATEGORY = {skill.lower(): category for category, skills in _SKILL_VOCABULARY.items() for skill in skills}
+
+# 关键词提取：标点替换为空格，过滤停用词
+_PUNCT_RE = re.compile(r'[^\w\s]')
+# ASCII文本的快速路径：与 _PUNCT_RE 覆盖完全相同字符的转换表
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in map(chr, range(128)) if _PUNCT_RE.match(c)})
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were'})
+
+def _is_keyword(word: str) -> bool:
+    """过滤停用词和短词"""
+    return len(word) > 3 and word not in _STOP_WORDS
+
+# 匹配分析提示模板：前缀 + 职位描述 + 中段 + 简历内容 + 后缀
+_PROMPT_PREFIX = """
+作为一名专业的招聘顾问和简历分析师，请分析以下简历与职位的匹配度：
+
+**职位描述：**
+"""
+
+_PROMPT_MIDDLE = """
+
+**简历内容：**
+"""
+
+_PROMPT_SUFFIX = """
+
+请提供详细的匹配度分析报告，包括：
+
+**1. 整体匹配度评分 (0-100分)**
+基于技能、经验、教育背景等因素给出综合评分
+
+**2. 技能匹配分析**
+- 完全匹配的技能
+- 部分匹配的技能
+- 缺失的关键技能
+
+**3. 经验匹配度**
+- 相关工作经验年限
+- 行业背景契合度
+- 项目经验相关性
+
+**4. 关键词优化建议**
+- 需要增加的关键词
+- 可以强化的技能描述
+- ATS系统优化建议
+
+**5. 简历改进建议**
+- 具体的优化方向
+- 需要突出的经验
+- 格式和结构建议
+
+**6. 申请成功概率评估**
+基于匹配度给出申请成功的可能性
+
+请用结构化的格式提供分析结果，使用emoji来增强可读性。
+"""
+
+@functools.cache
+def _pdf_module():
+    """延迟导入PDF解析库（优先使用pypdf，回退到PyPDF2），首次导入后缓存模块"""
+    try:
+        import pypdf
+        return pypdf
+    except ImportError:
+        import PyPDF2
+        return PyPDF2
+
+def _extract_pdf_text(file_path: Path) -> str:
+    """同步提取PDF全部页面文本"""
+    with open(file_path, 'rb') as f:
+        reader = _pdf_module().PdfReader(f)
+        return "".join(page.extract_text() or "" for page in reader.pages)
+
+@functools.lru_cache(maxsize=32)
+def _read_resume_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """读取简历文本；mtime/size参与缓存键，文件修改后自动失效"""
+    file_path = Path(path_str)
+    if file_path.suffix.lower() == '.pdf':
+        return _extract_pdf_text(file_path)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+# 某类别提取到的技能：展示名列表 + 预先算好的小写集合，供匹配计算直接做集合运算
+_SkillSet = namedtuple('_SkillSet', 'originals lower_set')
+
+def _to_skill_set(skills) -> _SkillSet:
+    """由展示名列表构建 _SkillSet"""
+    originals = list(skills)
+    return _SkillSet(originals, frozenset(skill.lower() for skill in originals))
+
+def _build_skill_automaton():
+    """构建全部技能的Aho-Corasick自动机，单次扫描命中所有类别"""
+    automaton = ahocorasick.Automaton()
+    for category, skills in _SKILL_VOCABULARY.items():
+        for skill in skills:
+            automaton.add_word(skill.lower(), (category, skill, len(skill)))
+    for alias, skill in _SKILL_ALIASES.items():
+        automaton.add_word(alias, (_SKILL_CATEGORY[skill], _SKILL_DISPLAY[skill], len(alias)))
+    automaton.make_automaton()
+    return automaton
+
+# 模块级只构建一次，所有JobMatcher实例共享
+_SKILL_AUTOMATON = _build_skill_automaton() if ahocorasick else None
+
 class JobMatcher:
     """职位匹配度分析器"""
 
+    __slots__ = ('config', '_invoke', '_job_prefix', 'client', 'skill_weights')
+
     def __init__(self, ai_config: Dict):
         self.config = ai_config
+        # 提供商调用入口，初始化客户端时绑定
+        self._invoke = None
+        # 最近一次构建的职位提示前缀：(职位描述, 前缀)
+        self._job_prefix: Optional[Tuple[str, str]] = None
         self.client = self._initialize_ai_client()
 
         # 技能权重配置
@@ -30,14 +197,18 @@ class JobMatcher:
         }
 
     def _initialize_ai_client(self):
-        """初始化AI客户端"""
+        """初始化AI客户端（异步SDK，避免阻塞事件循环）"""
         try:
             if self.config.get('anthropic_api_key'):
-                import anthropic
-                return anthropic.Anthropic(api_key=self.config['anthropic_api_key'])
+                client = get_shared_client('anthropic', self.config['anthropic_api_key'],
+                                           self.config.get('max_retries', 5))
+                self._invoke = self._invoke_anthropic
+                return client
             elif self.config.get('openai_api_key'):
-                import openai
-                return openai.OpenAI(api_key=self.config['openai_api_key'])
+                client = get_shared_client('openai', self.config['openai_api_key'],
+                                           self.config.get('max_retries', 5))
+                self._invoke = self._invoke_openai
+                return client
             else:
                 logger.info("未配置AI API密钥，使用基础匹配算法")
                 return None
@@ -45,6 +216,10 @@ class JobMatcher:
             logger.error(f"AI库导入失败: {e}")
             return None
 
+    def _analysis_limit(self) -> asyncio.Semaphore:
+        """所有匹配分析共享的AI并发限制"""
+        return get_semaphore('analysis', self.config.get('max_concurrent', 5))
+
     async def analyze_match(self, job_description: str, resume_content: str = "") -> str:
         """分析职位匹配度
 
@@ -74,28 +249,21 @@ class JobMatcher:
         try:
             file_path = Path(file_path)
 
-            if file_path.suffix.lower() == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-
-            elif file_path.suffix.lower() == '.pdf':
-                # 需要PDF读取库
-                try:
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        reader = PyPDF2.PdfReader(f)
-                        text = ""
-                        for page in reader.pages:
-                            text += page.extract_text()
-                        return text
-                except ImportError:
-                    logger.warning("未安装PyPDF2，无法读取PDF简历")
-                    return ""
-
-            else:
+            if file_path.suffix.lower() not in ('.txt', '.pdf'):
                 logger.warning(f"不支持的简历文件格式: {file_path.suffix}")
                 return ""
 
+            # 按 (路径, mtime, 大小) 缓存解析结果，同一份简历匹配多个职位时无需重复解析；
+            # 读取在工作线程中进行，不阻塞事件循环
+            stat = file_path.stat()
+            try:
+                return await asyncio.to_thread(
+                    _read_resume_cached, str(file_path), stat.st_mtime_ns, stat.st_size
+                )
+            except ImportError:
+                logger.warning("未安装pypdf/PyPDF2，无法读取PDF简历")
+                return ""
+
         except Exception as e:
             logger.error(f"读取简历文件失败: {e}")
             return ""
@@ -104,194 +272,155 @@ class JobMatcher:
         """使用AI进行深度匹配分析"""
         try:
             prompt = self._build_match_analysis_prompt(job_description, resume_content)
-
-            if 'anthropic' in str(type(self.client)):
-                # Claude API
-                message = self.client.messages.create(
-                    model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
-                    max_tokens=self.config.get('max_tokens', 2000),
-                    temperature=self.config.get('temperature', 0.3),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return message.content[0].text
-
-            elif 'openai' in str(type(self.client)):
-                # OpenAI API
-                response = self.client.chat.completions.create(
-                    model=self.config.get('default_model', 'gpt-3.5-turbo'),
-                    max_tokens=self.config.get('max_tokens', 2000),
-                    temperature=self.config.get('temperature', 0.3),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.choices[0].message.content
+            return await self._invoke(prompt)
 
         except Exception as e:
             logger.error(f"AI匹配分析失败: {e}")
             return await self._basic_match_analysis(job_description, resume_content)
 
+    async def _invoke_anthropic(self, prompt: str) -> str:
+        """调用Claude API"""
+        async with self._analysis_limit():
+            message = await self.client.messages.create(
+                model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
+                max_tokens=self.config.get('max_tokens', 2000),
+                temperature=self.config.get('temperature', 0.3),
+                messages=[{"role": "user", "content": prompt}]
+            )
+        return message.content[0].text
+
+    async def _invoke_openai(self, prompt: str) -> str:
+        """调用OpenAI API"""
+        async with self._analysis_limit():
+            response = await self.client.chat.completions.create(
+                model=self.config.get('default_model', 'gpt-3.5-turbo'),
+                max_tokens=self.config.get('max_tokens', 2000),
+                temperature=self.config.get('temperature', 0.3),
+                messages=[{"role": "user", "content": prompt}]
+            )
+        return response.choices[0].message.content
+
+    def prepare_for_job(self, job_description: str) -> str:
+        """预先构建某职位的提示前缀；同一职位分析多份简历时只构建一次"""
+        if self._job_prefix is None or self._job_prefix[0] != job_description:
+            prefix = "".join((_PROMPT_PREFIX, job_description[:2000], _PROMPT_MIDDLE))
+            self._job_prefix = (job_description, prefix)
+        return self._job_prefix[1]
+
     def _build_match_analysis_prompt(self, job_description: str, resume_content: str) -> str:
         """构建匹配分析提示"""
-        prompt = f"""
-作为一名专业的招聘顾问和简历分析师，请分析以下简历与职位的匹配度：
-
-**职位描述：**
-{job_description[:2000]}
-
-**简历内容：**
-{resume_content[:2000]}
-
-请提供详细的匹配度分析报告，包括：
-
-**1. 整体匹配度评分 (0-100分)**
-基于技能、经验、教育背景等因素给出综合评分
-
-**2. 技能匹配分析**
-- 完全匹配的技能
-- 部分匹配的技能
-- 缺失的关键技能
-
-**3. 经验匹配度**
-- 相关工作经验年限
-- 行业背景契合度
-- 项目经验相关性
-
-**4. 关键词优化建议**
-- 需要增加的关键词
-- 可以强化的技能描述
-- ATS系统优化建议
-
-**5. 简历改进建议**
-- 具体的优化方向
-- 需要突出的经验
-- 格式和结构建议
-
-**6. 申请成功概率评估**
-基于匹配度给出申请成功的可能性
-
-请用结构化的格式提供分析结果，使用emoji来增强可读性。
-"""
-        return prompt
+        return "".join((self.prepare_for_job(job_description), resume_content[:2000], _PROMPT_SUFFIX))
 
     async def _basic_match_analysis(self, job_description: str, resume_content: str = "") -> str:
         """基础匹配分析（无AI）"""
         try:
-            # 提取职位要求
-            job_skills = self._extract_skills_from_job(job_description)
-            job_keywords = self._extract_keywords(job_description)
-
             # 分析简历（如果有）
             if resume_content:
-                resume_skills = self._extract_skills_from_resume(resume_content)
+                # 职位描述和简历共用同一套技能/关键词提取逻辑
+                job_skills = self._extract_skills_from_job(job_description)
+                resume_skills = self._extract_skills_from_job(resume_content)
+                job_keywords = self._extract_keywords(job_description)
                 resume_keywords = self._extract_keywords(resume_content)
 
                 # 计算匹配度
                 skill_match = self._calculate_skill_match(job_skills, resume_skills)
-                keyword_match = self._calculate_keyword_match(job_keywords, resume_keywords)
+                keyword_match, matched_keywords = self._calculate_keyword_match(job_keywords, resume_keywords)
 
                 overall_score = (skill_match * 0.7 + keyword_match * 0.3)
 
                 return self._format_basic_analysis(
-                    overall_score, job_skills, resume_skills, job_keywords, resume_keywords
+                    overall_score, job_skills, resume_skills, job_keywords, matched_keywords
                 )
             else:
+                # 仅提取职位要求
+                job_skills = self._extract_skills_from_job(job_description)
+                job_keywords = self._extract_keywords(job_description)
                 return self._format_job_only_analysis(job_skills, job_keywords)
 
         except Exception as e:
             logger.error(f"基础匹配分析失败: {e}")
             return f"分析过程中出现错误: {str(e)}"
 
-    def _extract_skills_from_job(self, job_description: str) -> Dict[str, List[str]]:
+    def _extract_skills_from_job(self, job_description: str) -> Dict[str, _SkillSet]:
         """从职位描述中提取技能"""
-        skills = {
-            'programming_languages': [],
-            'frameworks': [],
-            'tools': [],
-            'databases': [],
-            'soft_skills': []
-        }
-
-        # 编程语言
-        prog_langs = ['Python', 'JavaScript', 'Java', 'C++', 'C#', 'Go', 'Rust', 'PHP', 'Ruby', 'Scala', 'Kotlin', 'Swift', 'TypeScript']
-        # 框架
-        frameworks = ['React', 'Vue', 'Angular', 'Django', 'Flask', 'Spring', 'Express', 'Laravel', 'Rails', 'ASP.NET']
-        # 工具
-        tools = ['Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Git', 'Jenkins', 'Terraform', 'Ansible']
-        # 数据库
-        databases = ['MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch', 'Oracle', 'SQL Server']
-        # 软技能
-        soft_skills = ['leadership', 'communication', 'teamwork', 'problem solving', 'analytical', 'creative']
-
         job_desc_lower = job_description.lower()
 
-        for lang in prog_langs:
-            if lang.lower() in job_desc_lower:
-                skills['programming_languages'].append(lang)
-
-        for framework in frameworks:
-            if framework.lower() in job_desc_lower:
-                skills['frameworks'].append(framework)
-
-        for tool in tools:
-            if tool.lower() in job_desc_lower:
-                skills['tools'].append(tool)
-
-        for db in databases:
-            if db.lower() in job_desc_lower:
-                skills['databases'].append(db)
-
-        for skill in soft_skills:
-            if skill in job_desc_lower:
-                skills['soft_skills'].append(skill)
-
-        return skills
-
-    def _extract_skills_from_resume(self, resume_content: str) -> Dict[str, List[str]]:
-        """从简历中提取技能"""
-        # 复用职位技能提取逻辑
-        return self._extract_skills_from_job(resume_content)
+        if _SKILL_AUTOMATON is not None:
+            # 单次扫描，按类别收集并按出现顺序去重
+            found = {category: {} for category in _SKILL_VOCABULARY}
+            for end_idx, (category, skill, length) in _SKILL_AUTOMATON.iter(job_desc_lower):
+                start_idx = end_idx - length + 1
+                if is_whole_word(job_desc_lower, start_idx, end_idx + 1):
+                    found[category][skill] = None
+            return {category: _to_skill_set(skills) for category, skills in found.items()}
+
+        # 无自动机时逐词查找，记录首次出现位置后排序，结果与自动机路径一致
+        found = {category: {} for category in _SKILL_VOCABULARY}
+        for category, vocabulary in _SKILL_VOCABULARY_LOWER.items():
+            for lower, display in vocabulary:
+                end = find_word(job_desc_lower, lower)
+                if end != -1:
+                    found[category][display] = end
+
+        # 别名命中时归入对应标准技能
+        for alias, skill in _SKILL_ALIASES.items():
+            end = find_word(job_desc_lower, alias)
+            if end != -1:
+                positions = found[_SKILL_CATEGORY[skill]]
+                display = _SKILL_DISPLAY[skill]
+                if display not in positions or end < positions[display]:
+                    positions[display] = end
+
+        return {category: _to_skill_set(sorted(positions, key=positions.get))
+                for category, positions in found.items()}
 
     def _extract_keywords(self, text: str) -> List[str]:
         """提取关键词"""
-        # 移除标点符号并转换为小写
-        cleaned_text = re.sub(r'[^\w\s]', ' ', text.lower())
-        words = cleaned_text.split()
+        # 移除标点符号并转换为小写（纯ASCII文本用translate，否则用正则）
+        text_lower = text.lower()
+        if text_lower.isascii():
+            cleaned_text = text_lower.translate(_PUNCT_TABLE)
+        else:
+            cleaned_text = _PUNCT_RE.sub(' ', text_lower)
 
-        # 过滤停用词和短词
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were'}
-        keywords = [word for word in words if len(word) > 3 and word not in stop_words]
+        # 先在C层统计全部词频，再只对去重后的词过滤停用词和短词：
+        # Python层的过滤次数从“总词数”降到“不同词数”
+        all_counts = Counter(cleaned_text.split())
+        word_counts = Counter({word: count for word, count in all_counts.items() if _is_keyword(word)})
 
         # 返回最常见的关键词
-        from collections import Counter
-        word_counts = Counter(keywords)
         return [word for word, count in word_counts.most_common(20)]
 
     def _calculate_skill_match(self, job_skills: Dict, resume_skills: Dict) -> float:
         """计算技能匹配度"""
-        total_score = 0.0
-        total_weight = 0.0
-
-        for category, weight in self.skill_weights.items():
-            job_category_skills = set(skill.lower() for skill in job_skills.get(category, []))
-            resume_category_skills = set(skill.lower() for skill in resume_skills.get(category, []))
+        # 每个类别的 (得分 × 权重, 权重)，职位未要求的类别不计入；
+        # 提取结果总是包含全部类别，可直接按类别取值
+        contribs = [
+            (len(job_set & resume_skills[category].lower_set) / len(job_set) * weight, weight)
+            for category, weight in self.skill_weights.items()
+            for job_set in (job_skills[category].lower_set,)
+            if job_set
+        ]
+        if not contribs:
+            return 0.0
 
-            if job_category_skills:
-                match_count = len(job_category_skills.intersection(resume_category_skills))
-                category_score = match_count / len(job_category_skills)
-                total_score += category_score * weight
-                total_weight += weight
+        total_score = sum(score for score, _ in contribs)
+        total_weight = sum(weight for _, weight in contribs)
+        return total_score / total_weight * 100
 
-        return (total_score / total_weight * 100) if total_weight > 0 else 0.0
+    def _calculate_keyword_match(self, job_keywords: List[str], resume_keywords: List[str]) -> Tuple[float, Set[str]]:
+        """计算关键词匹配度
 
-    def _calculate_keyword_match(self, job_keywords: List[str], resume_keywords: List[str]) -> float:
-        """计算关键词匹配度"""
+        Returns:
+            (匹配度, 简历覆盖到的职位关键词集合)
+        """
         if not job_keywords:
-            return 0.0
+            return 0.0, set()
 
         job_set = set(job_keywords)
-        resume_set = set(resume_keywords)
+        matched = job_set.intersection(resume_keywords)
 
-        match_count = len(job_set.intersection(resume_set))
-        return (match_count / len(job_set)) * 100
+        return (len(matched) / len(job_set)) * 100, matched
 
     def _format_basic_analysis(
         self,
@@ -299,7 +428,7 @@ class JobMatcher:
         job_skills: Dict,
         resume_skills: Dict,
         job_keywords: List[str],
-        resume_keywords: List[str]
+        matched_keywords: Set[str]
     ) -> str:
         """格式化基础分析结果"""
         # 计算匹配和缺失的技能
@@ -307,8 +436,8 @@ class JobMatcher:
         missing_skills = []
 
         for category in job_skills:
-            job_category_skills = set(skill.lower() for skill in job_skills[category])
-            resume_category_skills = set(skill.lower() for skill in resume_skills[category])
+            job_category_skills = job_skills[category].lower_set
+            resume_category_skills = resume_skills[category].lower_set
 
             matched = job_category_skills.intersection(resume_category_skills)
             missing = job_category_skills - resume_category_skills
@@ -336,7 +465,7 @@ class JobMatcher:
 {', '.join(job_keywords[:10])}
 
 ### 简历关键词覆盖
-{', '.join(set(job_keywords).intersection(set(resume_keywords))) if set(job_keywords).intersection(set(resume_keywords)) else '关键词覆盖较少'}
+{', '.join(matched_keywords) if matched_keywords else '关键词覆盖较少'}
 
 ## 💡 优化建议
 
@@ -371,7 +500,7 @@ class JobMatcher:
 
     def _format_job_only_analysis(self, job_skills: Dict, job_keywords: List[str]) -> str:
         """格式化仅职位分析结果"""
-        total_skills = sum(len(skills) for skills in job_skills.values())
+        total_skills = sum(len(skills.originals) for skills in job_skills.values())
 
         result = f"""# 📋 职位要求分析
 
@@ -379,7 +508,8 @@ class JobMatcher:
 
 """
 
-        for category, skills in job_skills.items():
+        for category, skill_set in job_skills.items():
+            skills = skill_set.originals
             if skills:
                 category_name = {
                     'programming_languages': '编程语言',
@@ -4,20 +4,202 @@
 """
 
 import asyncio
+import copy
+import hashlib
+import heapq
 import logging
 import re
-from typing import Dict, List, Tuple, Optional
-from collections import Counter
+import time
+from itertools import islice
+from operator import itemgetter
+from typing import AsyncIterator, Dict, FrozenSet, List, Tuple, Optional
+from collections import Counter, OrderedDict
 
+from src.utils.ai_common import get_shared_client, is_word_char
 from src.utils.logger import get_logger
 
+try:
+    import ahocorasick
+except ImportError:  # 可选依赖，缺失时回退到正则扫描
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
+# 各类别的固定关键词（小写）
+_TECH_KEYWORDS = (
+    'python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'php', 'ruby', 'scala', 'kotlin', 'swift', 'typescript',
+    'react', 'vue', 'angular', 'django', 'flask', 'spring', 'express', 'laravel', 'rails', 'asp.net',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'terraform', 'ansible',
+    'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sql server'
+)
+_SOFT_KEYWORDS = (
+    'leadership', 'communication', 'teamwork', 'problem-solving', 'problem solving', 'analytical', 'creative', 'strategic',
+    'project management', 'agile', 'scrum', 'collaboration', 'mentoring', 'coaching'
+)
+_EXP_KEYWORDS = (
+    'experience', 'background', 'expertise', 'proficiency',
+    'senior', 'lead', 'principal', 'architect', 'manager', 'director',
+    'develop', 'build', 'design', 'implement', 'manage', 'coordinate'
+)
+
+# 工作年限（如 "5+ years"）不是固定词，只能用正则匹配
+_YEARS_PATTERN = r'\d+\+?\s*years?'
+
+_KEYWORD_CATEGORIES = (
+    ('technical_skills', _TECH_KEYWORDS),
+    ('soft_skills', _SOFT_KEYWORDS),
+    ('experience_keywords', _EXP_KEYWORDS),
+)
+
+# 预编译的正则：模块加载时编译一次，各方法直接复用
+# 每个类别合并为一个交替式，每类只需扫描一次文本
+def _category_re(*alternatives: str) -> re.Pattern:
+    """把同一类别的多组关键词合并为一个按单词边界匹配的正则
+
+    关键词均为小写，扫描前文本也已转为小写，因此不需要IGNORECASE。
+    """
+    return re.compile(r'\b(' + '|'.join(alternatives) + r')\b')
+
+def _literal_alternatives(keywords) -> List[str]:
+    """固定关键词转为正则交替项，长词优先"""
+    return [re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)]
+
+_TECH_RE = _category_re(*_literal_alternatives(_TECH_KEYWORDS))
+_SOFT_RE = _category_re(*_literal_alternatives(_SOFT_KEYWORDS))
+_EXP_RE = _category_re(_YEARS_PATTERN, *_literal_alternatives(_EXP_KEYWORDS))
+_YEARS_RE = _category_re(_YEARS_PATTERN)
+
+def _is_boundary(text: str, index: int) -> bool:
+    """index处是否为单词边界（两侧恰好一侧是单词字符）"""
+    before = index > 0 and is_word_char(text[index - 1])
+    after = index < len(text) and is_word_char(text[index])
+    return before != after
+
+def _build_keyword_automaton():
+    """构建全部类别固定关键词的Aho-Corasick自动机，单次扫描命中所有类别"""
+    automaton = ahocorasick.Automaton()
+    for category, keywords in _KEYWORD_CATEGORIES:
+        for keyword in keywords:
+            automaton.add_word(keyword, (category, keyword))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick else None
+
+_CATEGORY_RES = (
+    ('technical_skills', _TECH_RE),
+    ('soft_skills', _SOFT_RE),
+    ('experience_keywords', _EXP_RE),
+)
+
+# 拼接简历和职位描述时使用的分隔符：非单词字符，关键词和年限正则都无法跨越
+_SCAN_SEPARATOR = "\x00"
+
+def _iter_keyword_hits(text_lower: str):
+    """扫描已小写的文本，产出 (起始位置, 类别, 关键词)"""
+    if _KEYWORD_AUTOMATON is not None:
+        # 固定关键词单次扫描，按单词边界过滤后归入各类别
+        for end_idx, (category, keyword) in _KEYWORD_AUTOMATON.iter(text_lower):
+            start = end_idx - len(keyword) + 1
+            if _is_boundary(text_lower, start) and _is_boundary(text_lower, end_idx + 1):
+                yield start, category, keyword
+
+        # 工作年限仍用正则
+        for match in _YEARS_RE.finditer(text_lower):
+            yield match.start(), 'experience_keywords', match.group(1)
+
+    else:
+        for category, pattern in _CATEGORY_RES:
+            for match in pattern.finditer(text_lower):
+                yield match.start(), category, match.group(1)
+
+def _empty_keywords() -> Dict[str, List[str]]:
+    """各类别的空关键词列表"""
+    return {
+        'technical_skills': [],
+        'soft_skills': [],
+        'tools': [],
+        'certifications': [],
+        'experience_keywords': []
+    }
+
+def _freeze_keywords(keywords: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+    """各类别去重为frozenset（排序只影响展示，交给格式化环节）"""
+    return {category: frozenset(hits) for category, hits in keywords.items()}
+
+def _display_order(keywords) -> List[str]:
+    """展示顺序：长词优先，同长度按字母序"""
+    return sorted(keywords, key=lambda keyword: (-len(keyword), keyword))
+
+# 关键词密度统计时忽略的简历常用词
+_DENSITY_STOP_WORDS = frozenset({
+    'experience', 'work', 'company', 'project', 'team', 'development',
+    'management', 'application', 'system', 'technology', 'business'
+})
+
+# 关键词优化提示模板：静态部分只构建一次，每次调用只替换职位和简历内容
+_OPTIMIZE_PROMPT_TMPL = """
+作为一名专业的简历优化专家和ATS系统专家，请优化以下简历以匹配目标职位。
+
+**目标职位描述：**
+{job}
+
+**原始简历内容：**
+{resume}
+
+**优化要求：**
+
+1. **关键词优化**
+   - 识别职位描述中的关键技能和要求
+   - 在简历中自然地融入这些关键词
+   - 确保关键词的使用符合上下文
+   - 优化技能关键词以提高ATS通过率
+
+2. **技能部分强化**
+   - 重新排列技能部分，优先展示匹配的技能
+   - 添加职位要求中提到但简历中缺失的相关技能
+   - 使用与职位描述一致的技术术语
+
+3. **经验描述优化**
+   - 调整工作经验描述，突出与目标职位相关的成果
+   - 使用量化数据增强说服力
+   - 采用行动导向的语言（Action-Result format）
+
+4. **格式和结构优化**
+   - 确保重要关键词在简历前1/3部分出现
+   - 优化段落结构，提高可读性
+   - 保持专业格式
+
+5. **ATS友好性**
+   - 使用标准的简历段落标题
+   - 避免使用图表、特殊字符
+   - 确保关键信息易于机器解析
+
+**请返回优化后的完整简历内容，保持原有的基本信息和经历，但要显著提高与目标职位的匹配度。**
+
+优化后的简历：
+"""
+
+# ATS识别的标准简历段落标题（小写）
+_STANDARD_SECTIONS = ('experience', 'education', 'skills', 'summary', 'objective')
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_SPECIAL_RE = re.compile(r'[^\w\s\-.,()@/:]')
+_WORD_RE = re.compile(r'\b\w{4,}\b')
+_NUM_RE = re.compile(r'\d+')
+
 class ResumeOptimizer:
     """简历优化器"""
 
+    # 结果缓存（LRU，可选TTL），所有实例共享：键 -> (过期时间, 结果)
+    _result_cache: "OrderedDict[bytes, Tuple[float, object]]" = OrderedDict()
+
     def __init__(self, ai_config: Dict):
         self.config = ai_config
+        self._cache_ttl = self.config.get('cache_ttl', 3600)
+        self._cache_maxsize = self.config.get('cache_maxsize', 256)
+        # 提供商流式调用入口，初始化客户端时绑定，避免每次调用判断客户端类型
+        self._invoke_stream = None
         self.client = self._initialize_ai_client()
 
         # ATS关键词权重
@@ -29,14 +211,16 @@ class ResumeOptimizer:
         }
 
     def _initialize_ai_client(self):
-        """初始化AI客户端"""
+        """初始化AI客户端（异步SDK，避免阻塞事件循环）"""
         try:
             if self.config.get('anthropic_api_key'):
-                import anthropic
-                return anthropic.Anthropic(api_key=self.config['anthropic_api_key'])
+                self._invoke_stream = self._stream_anthropic
+                return get_shared_client('anthropic', self.config['anthropic_api_key'],
+                                         self.config.get('max_retries', 5))
             elif self.config.get('openai_api_key'):
-                import openai
-                return openai.OpenAI(api_key=self.config['openai_api_key'])
+                self._invoke_stream = self._stream_openai
+                return get_shared_client('openai', self.config['openai_api_key'],
+                                         self.config.get('max_retries', 5))
             else:
                 logger.info("未配置AI API密钥，使用基础优化算法")
                 return None
@@ -56,96 +240,108 @@ class ResumeOptimizer:
         """
         try:
             if self.client:
-                return await self._ai_keyword_optimization(resume_content, job_posting)
-            else:
-                return await self._basic_keyword_optimization(resume_content, job_posting)
+                cache_key = self._cache_key('ai', self.config.get('default_model', ''),
+                                            resume_content, job_posting)
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    return cached
+
+                try:
+                    result = await self._ai_keyword_optimization(resume_content, job_posting)
+                except Exception as e:
+                    # 回退结果不写入AI缓存，下次调用重新尝试AI
+                    logger.error(f"AI关键词优化失败: {e}")
+                    return await self._basic_keyword_optimization(resume_content, job_posting)
+
+                self._cache_set(cache_key, result, ttl=self._cache_ttl)
+                return result
+
+            cache_key = self._cache_key('basic', resume_content, job_posting)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+            result = await self._basic_keyword_optimization(resume_content, job_posting)
+            self._cache_set(cache_key, result)
+            return result
 
         except Exception as e:
             logger.error(f"关键词优化失败: {e}")
             return resume_content
 
-    async def _ai_keyword_optimization(self, resume_content: str, job_posting: str) -> str:
-        """使用AI进行关键词优化"""
-        try:
-            prompt = self._build_optimization_prompt(resume_content, job_posting)
-
-            if 'anthropic' in str(type(self.client)):
-                # Claude API
-                message = self.client.messages.create(
-                    model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
-                    max_tokens=self.config.get('max_tokens', 3000),
-                    temperature=self.config.get('temperature', 0.5),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return message.content[0].text
-
-            elif 'openai' in str(type(self.client)):
-                # OpenAI API
-                response = self.client.chat.completions.create(
-                    model=self.config.get('default_model', 'gpt-3.5-turbo'),
-                    max_tokens=self.config.get('max_tokens', 3000),
-                    temperature=self.config.get('temperature', 0.5),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.choices[0].message.content
-
-        except Exception as e:
-            logger.error(f"AI关键词优化失败: {e}")
-            return await self._basic_keyword_optimization(resume_content, job_posting)
-
-    def _build_optimization_prompt(self, resume_content: str, job_posting: str) -> str:
-        """构建优化提示"""
-        prompt = f"""
-作为一名专业的简历优化专家和ATS系统专家，请优化以下简历以匹配目标职位。
-
-**目标职位描述：**
-{job_posting[:2000]}
-
-**原始简历内容：**
-{resume_content[:2000]}
-
-**优化要求：**
-
-1. **关键词优化**
-   - 识别职位描述中的关键技能和要求
-   - 在简历中自然地融入这些关键词
-   - 确保关键词的使用符合上下文
-   - 优化技能关键词以提高ATS通过率
+    def _cache_key(self, *parts: str) -> bytes:
+        """根据输入内容计算缓存键"""
+        raw = "\x00".join(parts)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
 
-2. **技能部分强化**
-   - 重新排列技能部分，优先展示匹配的技能
-   - 添加职位要求中提到但简历中缺失的相关技能
-   - 使用与职位描述一致的技术术语
+    def _cache_get(self, key: bytes):
+        """读取未过期的缓存结果"""
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
 
-3. **经验描述优化**
-   - 调整工作经验描述，突出与目标职位相关的成果
-   - 使用量化数据增强说服力
-   - 采用行动导向的语言（Action-Result format）
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._result_cache.pop(key, None)
+            return None
 
-4. **格式和结构优化**
-   - 确保重要关键词在简历前1/3部分出现
-   - 优化段落结构，提高可读性
-   - 保持专业格式
+        self._result_cache.move_to_end(key)
+        return value
 
-5. **ATS友好性**
-   - 使用标准的简历段落标题
-   - 避免使用图表、特殊字符
-   - 确保关键信息易于机器解析
+    def _cache_set(self, key: bytes, value, ttl: Optional[float] = None):
+        """写入缓存结果（ttl为None时不过期），超出容量时淘汰最久未使用的条目"""
+        expires_at = time.monotonic() + ttl if ttl is not None else float('inf')
+        self._result_cache[key] = (expires_at, value)
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self._cache_maxsize:
+            self._result_cache.popitem(last=False)
 
-**请返回优化后的完整简历内容，保持原有的基本信息和经历，但要显著提高与目标职位的匹配度。**
+    async def _ai_keyword_optimization(self, resume_content: str, job_posting: str) -> str:
+        """使用AI进行关键词优化（失败时抛出异常，由调用方回退）"""
+        parts = [
+            text async for text in self._stream_ai_optimization(resume_content, job_posting)
+        ]
+        return "".join(parts)
+
+    async def _stream_ai_optimization(self, resume_content: str, job_posting: str) -> AsyncIterator[str]:
+        """以流式方式调用AI进行关键词优化"""
+        prompt = self._build_optimization_prompt(resume_content, job_posting)
+        async for text in self._invoke_stream(prompt):
+            yield text
+
+    async def _stream_anthropic(self, prompt: str) -> AsyncIterator[str]:
+        """以流式方式调用Claude API"""
+        async with self.client.messages.stream(
+            model=self.config.get('default_model', 'claude-3-sonnet-20240229'),
+            max_tokens=self.config.get('max_tokens', 3000),
+            temperature=self.config.get('temperature', 0.5),
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def _stream_openai(self, prompt: str) -> AsyncIterator[str]:
+        """以流式方式调用OpenAI API"""
+        stream = await self.client.chat.completions.create(
+            model=self.config.get('default_model', 'gpt-3.5-turbo'),
+            max_tokens=self.config.get('max_tokens', 3000),
+            temperature=self.config.get('temperature', 0.5),
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-优化后的简历：
-"""
-        return prompt
+    def _build_optimization_prompt(self, resume_content: str, job_posting: str) -> str:
+        """构建优化提示"""
+        return _OPTIMIZE_PROMPT_TMPL.format(job=job_posting[:2000], resume=resume_content[:2000])
 
     async def _basic_keyword_optimization(self, resume_content: str, job_posting: str) -> str:
         """基础关键词优化（无AI）"""
         try:
-            # 提取职位关键词
-            job_keywords = self._extract_job_keywords(job_posting)
-
-            # 分析当前简历关键词
-            resume_keywords = self._extract_resume_keywords(resume_content)
+            # 一次扫描同时提取简历和职位关键词
+            resume_keywords, job_keywords = self._extract_keyword_pair(resume_content, job_posting)
 
             # 找出缺失的关键词
             missing_keywords = self._find_missing_keywords(job_keywords, resume_keywords)
@@ -161,77 +357,48 @@ class ResumeOptimizer:
             logger.error(f"基础关键词优化失败: {e}")
             return resume_content
 
-    def _extract_job_keywords(self, job_posting: str) -> Dict[str, List[str]]:
+    def _extract_job_keywords(self, job_posting: str) -> Dict[str, FrozenSet[str]]:
         """提取职位关键词"""
-        keywords = {
-            'technical_skills': [],
-            'soft_skills': [],
-            'tools': [],
-            'certifications': [],
-            'experience_keywords': []
-        }
-
-        # 技术技能关键词
-        technical_patterns = [
-            r'\b(Python|JavaScript|Java|C\+\+|C#|Go|Rust|PHP|Ruby|Scala|Kotlin|Swift|TypeScript)\b',
-            r'\b(React|Vue|Angular|Django|Flask|Spring|Express|Laravel|Rails|ASP\.NET)\b',
-            r'\b(AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|Terraform|Ansible)\b',
-            r'\b(MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch|Oracle|SQL Server)\b'
-        ]
+        keywords = _empty_keywords()
+        for _, category, keyword in _iter_keyword_hits(job_posting.lower()):
+            keywords[category].append(keyword)
+        return _freeze_keywords(keywords)
 
-        # 软技能关键词
-        soft_skills_patterns = [
-            r'\b(leadership|communication|teamwork|problem[- ]solving|analytical|creative|strategic)\b',
-            r'\b(project management|agile|scrum|collaboration|mentoring|coaching)\b'
-        ]
-
-        # 经验相关关键词
-        experience_patterns = [
-            r'\b(\d+\+?\s*years?|experience|background|expertise|proficiency)\b',
-            r'\b(senior|lead|principal|architect|manager|director)\b',
-            r'\b(develop|build|design|implement|manage|lead|coordinate)\b'
-        ]
-
-        job_lower = job_posting.lower()
-
-        # 提取技术技能
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, job_lower, re.IGNORECASE)
-            keywords['technical_skills'].extend(matches)
+    def _extract_keyword_pair(
+        self,
+        resume_content: str,
+        job_posting: str
+    ) -> Tuple[Dict[str, FrozenSet[str]], Dict[str, FrozenSet[str]]]:
+        """一次扫描同时提取简历和职位关键词
 
-        # 提取软技能
-        for pattern in soft_skills_patterns:
-            matches = re.findall(pattern, job_lower, re.IGNORECASE)
-            keywords['soft_skills'].extend(matches)
+        两段文本以分隔符拼接后只扫描一遍，按命中位置归入简历或职位。
 
-        # 提取经验关键词
-        for pattern in experience_patterns:
-            matches = re.findall(pattern, job_lower, re.IGNORECASE)
-            keywords['experience_keywords'].extend(matches)
+        Returns:
+            (简历关键词, 职位关键词)
+        """
+        resume_lower = resume_content.lower()
+        split_at = len(resume_lower)
+        text_lower = resume_lower + _SCAN_SEPARATOR + job_posting.lower()
 
-        # 去重并排序
-        for category in keywords:
-            keywords[category] = list(set(keywords[category]))
-            keywords[category].sort(key=len, reverse=True)  # 长词优先
+        resume_keywords = _empty_keywords()
+        job_keywords = _empty_keywords()
+        for start, category, keyword in _iter_keyword_hits(text_lower):
+            target = resume_keywords if start < split_at else job_keywords
+            target[category].append(keyword)
 
-        return keywords
+        return _freeze_keywords(resume_keywords), _freeze_keywords(job_keywords)
 
-    def _extract_resume_keywords(self, resume_content: str) -> Dict[str, List[str]]:
+    def _extract_resume_keywords(self, resume_content: str) -> Dict[str, FrozenSet[str]]:
         """提取简历关键词"""
         return self._extract_job_keywords(resume_content)  # 复用逻辑
 
-    def _find_missing_keywords(self, job_keywords: Dict, resume_keywords: Dict) -> Dict[str, List[str]]:
-        """找出缺失的关键词"""
-        missing = {}
-
-        for category in job_keywords:
-            job_set = set(keyword.lower() for keyword in job_keywords[category])
-            resume_set = set(keyword.lower() for keyword in resume_keywords.get(category, []))
-
-            missing_set = job_set - resume_set
-            missing[category] = list(missing_set)
-
-        return missing
+    def _find_missing_keywords(self, job_keywords: Dict, resume_keywords: Dict) -> Dict[str, FrozenSet[str]]:
+        """找出缺失的关键词（关键词已是小写frozenset，直接做集合差）"""
+        empty = frozenset()
+        return {
+            category: keywords - resume_keywords.get(category, empty)
+            for category, keywords in job_keywords.items()
+        }
 
     def _apply_basic_optimizations(
         self,
@@ -240,20 +407,19 @@ class ResumeOptimizer:
         missing_keywords: Dict
     ) -> str:
         """应用基础优化"""
-        optimized_content = resume_content
-
         # 创建优化建议而不是直接修改简历
         optimization_suggestions = self._generate_optimization_suggestions(
             job_keywords, missing_keywords
         )
 
-        # 在简历末尾添加优化建议
-        optimized_content += "\n\n" + "="*50
-        optimized_content += "\n📊 简历优化建议\n"
-        optimized_content += "="*50 + "\n"
-        optimized_content += optimization_suggestions
-
-        return optimized_content
+        # 在简历末尾添加优化建议（一次拼接，避免反复复制整份简历）
+        return "".join((
+            resume_content,
+            "\n\n" + "="*50,
+            "\n📊 简历优化建议\n",
+            "="*50 + "\n",
+            optimization_suggestions
+        ))
 
     def _generate_optimization_suggestions(self, job_keywords: Dict, missing_keywords: Dict) -> str:
         """生成优化建议"""
@@ -263,7 +429,7 @@ class ResumeOptimizer:
         if missing_keywords.get('technical_skills'):
             suggestions.append("🔧 **技术技能优化**")
             suggestions.append("建议在简历中添加以下技能（如果你有相关经验）：")
-            for skill in missing_keywords['technical_skills'][:5]:
+            for skill in _display_order(missing_keywords['technical_skills'])[:5]:
                 suggestions.append(f"   • {skill.title()}")
             suggestions.append("")
 
@@ -271,21 +437,21 @@ class ResumeOptimizer:
         if missing_keywords.get('soft_skills'):
             suggestions.append("💡 **软技能强化**")
             suggestions.append("建议在工作经验中体现以下能力：")
-            for skill in missing_keywords['soft_skills'][:3]:
+            for skill in _display_order(missing_keywords['soft_skills'])[:3]:
                 suggestions.append(f"   • {skill.title()}")
             suggestions.append("")
 
         # 关键词密度分析
         all_job_keywords = []
         for category in job_keywords.values():
-            all_job_keywords.extend(category)
+            all_job_keywords.extend(_display_order(category))
 
         if all_job_keywords:
             suggestions.append("📈 **关键词优化**")
             suggestions.append("职位描述中的高频关键词：")
-            keyword_counter = Counter(all_job_keywords)
-            for keyword, count in keyword_counter.most_common(8):
-                suggestions.append(f"   • {keyword.title()} (出现 {count} 次)")
+            # 各类别词表互不重叠且已去重，每个关键词只出现一次，无需再用Counter计数
+            for keyword in all_job_keywords[:8]:
+                suggestions.append(f"   • {keyword.title()} (出现 1 次)")
             suggestions.append("")
 
         # ATS优化建议
@@ -310,83 +476,98 @@ class ResumeOptimizer:
     async def analyze_ats_compatibility(self, resume_content: str) -> Dict[str, any]:
         """分析ATS兼容性"""
         try:
-            analysis = {
-                'score': 0,
-                'issues': [],
-                'recommendations': [],
-                'keyword_density': {},
-                'format_score': 0
-            }
+            # 分析结果只取决于简历内容，重复调用直接返回缓存副本
+            cache_key = self._cache_key('ats', resume_content)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+            analysis = self._compute_ats_analysis(resume_content)
+            self._cache_set(cache_key, copy.deepcopy(analysis))
+            return analysis
 
-            # 格式分析
-            format_issues = self._analyze_format_compatibility(resume_content)
-            analysis['issues'].extend(format_issues)
+        except Exception as e:
+            logger.error(f"ATS兼容性分析失败: {e}")
+            return {'score': 0, 'error': str(e)}
 
-            # 关键词密度分析
-            keyword_analysis = self._analyze_keyword_density(resume_content)
-            analysis['keyword_density'] = keyword_analysis
+    def _compute_ats_analysis(self, resume_content: str) -> Dict[str, any]:
+        """同步执行ATS兼容性分析（不含缓存，供进程池工作进程调用）"""
+        analysis = {
+            'score': 0,
+            'issues': [],
+            'recommendations': [],
+            'keyword_density': {},
+            'format_score': 0
+        }
 
-            # 结构分析
-            structure_score = self._analyze_resume_structure(resume_content)
-            analysis['format_score'] = structure_score
+        # 各子步骤共用同一份小写文本，避免重复转换整篇简历
+        resume_lower = resume_content.lower()
 
-            # 计算总体评分
-            analysis['score'] = self._calculate_ats_score(analysis)
+        # 格式分析
+        format_issues = self._analyze_format_compatibility(resume_content, resume_lower)
+        analysis['issues'].extend(format_issues)
 
-            # 生成建议
-            analysis['recommendations'] = self._generate_ats_recommendations(analysis)
+        # 关键词密度分析
+        keyword_analysis = self._analyze_keyword_density(resume_content, resume_lower)
+        analysis['keyword_density'] = keyword_analysis
 
-            return analysis
+        # 结构分析
+        structure_score = self._analyze_resume_structure(resume_content)
+        analysis['format_score'] = structure_score
 
-        except Exception as e:
-            logger.error(f"ATS兼容性分析失败: {e}")
-            return {'score': 0, 'error': str(e)}
+        # 计算总体评分
+        analysis['score'] = self._calculate_ats_score(analysis)
 
-    def _analyze_format_compatibility(self, resume_content: str) -> List[str]:
+        # 生成建议
+        analysis['recommendations'] = self._generate_ats_recommendations(analysis)
+
+        return analysis
+
+    def _analyze_format_compatibility(self, resume_content: str, resume_lower: Optional[str] = None) -> List[str]:
         """分析格式兼容性"""
         issues = []
+        if resume_lower is None:
+            resume_lower = resume_content.lower()
 
-        # 检查特殊字符
-        special_chars = re.findall(r'[^\w\s\-.,()@/:]', resume_content)
-        if len(special_chars) > 10:
+        # 检查特殊字符：逐个匹配，找到第11个即停止，不构建完整列表
+        special_chars = islice(_SPECIAL_RE.finditer(resume_content), 10, None)
+        if next(special_chars, None) is not None:
             issues.append("包含过多特殊字符，可能影响ATS解析")
 
         # 检查是否有标准段落标题
-        standard_sections = [
-            'experience', 'education', 'skills', 'summary', 'objective'
-        ]
         found_sections = 0
-        for section in standard_sections:
-            if section.lower() in resume_content.lower():
+        for section in _STANDARD_SECTIONS:
+            if section in resume_lower:
                 found_sections += 1
+                if found_sections >= 3:
+                    break
 
         if found_sections < 3:
             issues.append("缺少标准简历段落标题")
 
-        # 检查联系信息
-        if not re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_content):
+        # 检查联系信息（没有@时无需运行正则）
+        if '@' not in resume_content or not _EMAIL_RE.search(resume_content):
             issues.append("未找到有效的邮箱地址")
 
         return issues
 
-    def _analyze_keyword_density(self, resume_content: str) -> Dict[str, int]:
+    def _analyze_keyword_density(self, resume_content: str, resume_lower: Optional[str] = None) -> Dict[str, int]:
         """分析关键词密度"""
-        # 提取关键词并统计频率
-        words = re.findall(r'\b\w{4,}\b', resume_content.lower())
-        word_counter = Counter(words)
-
-        # 过滤停用词
-        stop_words = {
-            'experience', 'work', 'company', 'project', 'team', 'development',
-            'management', 'application', 'system', 'technology', 'business'
-        }
-
-        filtered_counter = {
-            word: count for word, count in word_counter.items()
-            if word not in stop_words and count > 1
-        }
+        if resume_lower is None:
+            resume_lower = resume_content.lower()
+
+        # 提取关键词并统计频率（Counter在C层计数）
+        word_counter = Counter(_WORD_RE.findall(resume_lower))
+
+        # 只对去重后的词过滤停用词和低频词，直接流入堆取前15个，不构建中间字典
+        top_words = heapq.nlargest(
+            15,
+            ((word, count) for word, count in word_counter.items()
+             if count > 1 and word not in _DENSITY_STOP_WORDS),
+            key=itemgetter(1)
+        )
 
-        return dict(filtered_counter.most_common(15))
+        return dict(top_words)
 
     def _analyze_resume_structure(self, resume_content: str) -> float:
         """分析简历结构评分"""
@@ -398,8 +579,8 @@ class ResumeOptimizer:
             score += 25
 
         # 段落结构检查
-        paragraphs = resume_content.split('\n\n')
-        if 4 <= len(paragraphs) <= 8:
+        paragraph_count = resume_content.count('\n\n') + 1
+        if 4 <= paragraph_count <= 8:
             score += 25
 
         # 项目符号使用
@@ -407,9 +588,9 @@ class ResumeOptimizer:
         if bullet_points >= 5:
             score += 25
 
-        # 数字和量化指标
-        numbers = re.findall(r'\d+', resume_content)
-        if len(numbers) >= 8:
+        # 数字和量化指标：找到第8个数字即停止
+        numbers = islice(_NUM_RE.finditer(resume_content), 7, None)
+        if next(numbers, None) is not None:
             score += 25
 
         return score
@@ -3,12 +3,21 @@
 使用Pydantic进行配置验证和管理
 """
 
+import hashlib
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 import os
 
+from src.utils.ai_common import anthropic_module, openai_module
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时使用标准库json
+    orjson = None
+
 class DatabaseConfig(BaseModel):
     """数据库配置"""
     path: str = "data/applications.db"
@@ -46,14 +55,20 @@ class AIConfig(BaseModel):
     anthropic_api_key: str = Field(default="", env="ANTHROPIC_API_KEY")
     openai_api_key: str = Field(default="", env="OPENAI_API_KEY")
     default_model: str = "claude-3-sonnet-20240229"
+    fast_model: str = ""  # 简单任务使用的轻量模型，留空则使用default_model
+    max_retries: int = 5  # 限流/服务端错误时的最大重试次数
     max_tokens: int = 4000
     temperature: float = 0.7
 
     def __init__(self, **data):
-        # 从环境变量读取API密钥
+        super().__init__(**self._apply_env_keys(data))
+
+    @staticmethod
+    def _apply_env_keys(data: Dict) -> Dict:
+        """从环境变量读取API密钥"""
         data["anthropic_api_key"] = data.get("anthropic_api_key") or os.getenv("ANTHROPIC_API_KEY", "")
         data["openai_api_key"] = data.get("openai_api_key") or os.getenv("OPENAI_API_KEY", "")
-        super().__init__(**data)
+        return data
 
 class LoggingConfig(BaseModel):
     """日志配置"""
@@ -73,6 +88,35 @@ class UserInfo(BaseModel):
     github: str = ""
     website: str = ""
 
+def _construct_trusted(model_cls, data: Dict):
+    """跳过校验递归构建模型（仅用于校验和匹配的已保存配置）"""
+    values = {}
+    for name, field in model_cls.model_fields.items():
+        if name not in data:
+            continue
+        value = data[name]
+        annotation = field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if isinstance(value, dict):
+                value = _construct_trusted(annotation, value)
+        elif isinstance(value, (dict, list)):
+            # List/Optional/Dict等容器中可能嵌套模型，交给Pydantic按注解构建
+            value = TypeAdapter(annotation).validate_python(value)
+        values[name] = value
+
+    if model_cls is AIConfig:
+        # model_construct不会调用__init__，这里补上环境变量中的API密钥
+        values = AIConfig._apply_env_keys(values)
+    return model_cls.model_construct(**values)
+
+def _checksum_path(config_file: Path) -> Path:
+    """配置文件校验和旁路文件路径"""
+    return config_file.with_name(config_file.name + ".sha256")
+
+def _serialize(settings: BaseModel) -> bytes:
+    """设置的规范JSON序列化（save_to_file写出的内容）"""
+    return json.dumps(settings.model_dump(), indent=2, ensure_ascii=False).encode('utf-8')
+
 class Settings(BaseModel):
     """应用程序设置"""
     database: DatabaseConfig = DatabaseConfig()
@@ -89,8 +133,21 @@ class Settings(BaseModel):
         try:
             config_file = Path(config_path)
             if config_file.exists():
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
+                raw = config_file.read_bytes()
+                if orjson is not None:
+                    config_data = orjson.loads(raw)
+                else:
+                    config_data = json.loads(raw.decode('utf-8'))
+
+                # 校验和与 save_to_file 写出时一致，说明内容是校验后模型的规范序列化，
+                # 跳过Pydantic校验；读取配置本身不写任何文件
+                try:
+                    checksum = _checksum_path(config_file).read_text(encoding='utf-8').strip()
+                    if checksum == hashlib.sha256(raw).hexdigest():
+                        return _construct_trusted(cls, config_data)
+                except OSError:
+                    pass
+
                 return cls(**config_data)
             else:
                 # 创建默认配置文件
@@ -104,9 +161,10 @@ class Settings(BaseModel):
     def save_to_file(self, config_path: str = "config.json"):
         """保存设置到JSON文件"""
         try:
-            config_data = self.model_dump()
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            raw = _serialize(self)
+            config_file = Path(config_path)
+            config_file.write_bytes(raw)
+            _checksum_path(config_file).write_text(hashlib.sha256(raw).hexdigest(), encoding='utf-8')
         except Exception as e:
             print(f"保存配置文件失败: {e}")
 
@@ -114,15 +172,13 @@ class Settings(BaseModel):
         """获取AI客户端"""
         if self.ai.anthropic_api_key:
             try:
-                import anthropic
-                return anthropic.Anthropic(api_key=self.ai.anthropic_api_key)
+                return anthropic_module().Anthropic(api_key=self.ai.anthropic_api_key)
             except ImportError:
                 print("未安装anthropic包")
                 return None
         elif self.ai.openai_api_key:
             try:
-                import openai
-                return openai.OpenAI(api_key=self.ai.openai_api_key)
+                return openai_module().OpenAI(api_key=self.ai.openai_api_key)
             except ImportError:
                 print("未安装openai包")
                 return None
@@ -130,8 +186,24 @@ class Settings(BaseModel):
             print("未配置AI API密钥")
             return None
 
-# 全局设置实例
-settings = Settings.load_from_file()
+@lru_cache(maxsize=4)
+def _load_settings(config_path: str, mtime_ns: Optional[int]) -> Settings:
+    """按文件修改时间缓存解析结果，配置文件变化后自动重新加载"""
+    return Settings.load_from_file(config_path)
+
+def get_settings(config_path: str = "config.json") -> Settings:
+    """获取全局设置实例（首次调用时才读取配置文件）"""
+    try:
+        mtime_ns = Path(config_path).stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _load_settings(config_path, mtime_ns)
+
+def __getattr__(name: str):
+    # 兼容旧的 `from src.config.settings import settings` 用法，延迟到访问时加载
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     # 测试配置加载
@@ -3,30 +3,218 @@
 处理数据库结构变更和数据迁移
 """
 
+import bisect
 import sqlite3
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional, Set
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# JSON列的存储函数：SQLite 3.45+ 以二进制JSONB存储，读取时无需重新解析文本；
+# 更早的版本退回 json()，写入前校验并压缩JSON文本
+JSON_STORAGE_FUNC = "jsonb" if sqlite3.sqlite_version_info >= (3, 45, 0) else "json"
+
+# 以JSON存储的列：(表名, 列名)
+_JSON_COLUMNS = (
+    ("applications", "application_answers"),
+    ("user_profiles", "profile_data"),
+)
+
+# 整数主键的职位/申请表结构（迁移006起的规范结构）
+_JOB_LISTINGS_INT_PK_SQL = """
+CREATE TABLE job_listings_v2 (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    location TEXT,
+    salary_range TEXT,
+    job_description TEXT,
+    requirements TEXT,
+    posted_date DATE,
+    job_url TEXT UNIQUE,
+    easy_apply BOOLEAN DEFAULT FALSE,
+    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_APPLICATIONS_INT_PK_SQL = """
+CREATE TABLE applications_v2 (
+    id INTEGER PRIMARY KEY,
+    job_id INTEGER,
+    job_url TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status TEXT DEFAULT 'applied',
+    cover_letter TEXT,
+    custom_resume TEXT,
+    application_answers TEXT,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (job_id) REFERENCES job_listings(id)
+)
+"""
+
+def split_sql_statements(script: str) -> List[str]:
+    """把SQL脚本拆分为单条语句
+
+    以分号切分后逐段累积，由 sqlite3.complete_statement 判断语句是否完整，
+    字符串、注释中的分号以及 CREATE TRIGGER ... END; 这类多分号语句都不会被错误截断。
+    只含注释或空白的片段会被丢弃。
+    """
+    statements = []
+    buffer = ""
+    for piece in script.split(";"):
+        buffer += piece + ";"
+        if not sqlite3.complete_statement(buffer):
+            continue
+        code = "\n".join(
+            line for line in buffer.splitlines() if not line.strip().startswith("--")
+        ).strip()
+        if code != ";":
+            statements.append(buffer.strip())
+        buffer = ""
+    if buffer.strip(" \t\r\n;"):
+        # 末尾缺少分号的最后一条语句
+        statements.append(buffer.rstrip(";").strip())
+    return statements
+
+def _execute_script(conn: sqlite3.Connection, script: str):
+    """在当前事务中逐条执行SQL脚本（executescript 会先提交当前事务，不能用于事务内）"""
+    for statement in split_sql_statements(script):
+        conn.execute(statement)
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+    """表的列名 -> 声明类型（表不存在时为空）"""
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+
+# 旧版本建表时可能缺少的列（DatabaseManager 自建表、早期的迁移001）
+_REQUIRED_COLUMNS = {
+    "job_listings": ("easy_apply", "created_at"),
+    "applications": ("created_at", "updated_at"),
+}
+
+def upgrade_to_integer_ids(conn: sqlite3.Connection) -> bool:
+    """把UUID文本主键的 job_listings / applications 重建为INTEGER主键（rowid别名）
+
+    兼容迁移系统和 DatabaseManager 两种历史建表方式：只复制新旧表共有的列，缺失的列
+    在重建时一并补齐；旧的职位ID按原行顺序映射为新ID，applications.job_id 和
+    cover_letters.job_id 随之更新，原有索引在新表上重建。不提交事务，由调用方提交。
+
+    Returns:
+        是否进行了重建（已是规范结构或表不存在时返回False）
+    """
+    job_columns = _table_columns(conn, "job_listings")
+    app_columns = _table_columns(conn, "applications")
+    if not job_columns:
+        return False
+    missing = [
+        column
+        for table, columns in (("job_listings", job_columns), ("applications", app_columns))
+        if columns
+        for column in _REQUIRED_COLUMNS[table] if column not in columns
+    ]
+    if job_columns.get("id") == "INTEGER" and not missing:
+        return False
+
+    index_sqls = [
+        row[0] for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            "AND tbl_name IN ('job_listings', 'applications')"
+        )
+    ]
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+
+    # 旧ID -> 新ID：按原行顺序编号，新表插入保持相同顺序
+    conn.execute("DROP TABLE IF EXISTS temp._job_id_map")
+    conn.execute("""
+        CREATE TEMP TABLE _job_id_map AS
+        SELECT id AS old_id, row_number() OVER (ORDER BY rowid) AS new_id
+        FROM job_listings
+    """)
+
+    conn.execute(_JOB_LISTINGS_INT_PK_SQL)
+    shared = [c for c in _table_columns(conn, "job_listings_v2") if c != "id" and c in job_columns]
+    column_list = ", ".join(shared)
+    conn.execute(f"""
+        INSERT INTO job_listings_v2 (id, {column_list})
+        SELECT m.new_id, {", ".join(f"j.{c}" for c in shared)}
+        FROM job_listings j JOIN _job_id_map m ON m.old_id IS j.id
+        ORDER BY m.new_id
+    """)
+
+    if app_columns:
+        conn.execute(_APPLICATIONS_INT_PK_SQL)
+        shared = [c for c in _table_columns(conn, "applications_v2")
+                  if c not in ("id", "job_id") and c in app_columns]
+        column_list = ", ".join(shared)
+        conn.execute(f"""
+            INSERT INTO applications_v2 (job_id, {column_list})
+            SELECT m.new_id, {", ".join(f"a.{c}" for c in shared)}
+            FROM applications a LEFT JOIN _job_id_map m ON m.old_id = a.job_id
+            ORDER BY a.rowid
+        """)
+        conn.execute("DROP TABLE applications")
+
+    if _table_columns(conn, "cover_letters"):
+        conn.execute("""
+            UPDATE cover_letters
+            SET job_id = (SELECT new_id FROM _job_id_map WHERE old_id = cover_letters.job_id)
+            WHERE job_id IS NOT NULL
+        """)
+
+    conn.execute("DROP TABLE job_listings")
+    conn.execute("ALTER TABLE job_listings_v2 RENAME TO job_listings")
+    if app_columns:
+        conn.execute("ALTER TABLE applications_v2 RENAME TO applications")
+    conn.execute("DROP TABLE temp._job_id_map")
+
+    for index_sql in index_sqls:
+        conn.execute(index_sql)
+
+    logger.info("job_listings / applications 已重建为整数主键")
+    return True
+
+def convert_json_columns(conn: sqlite3.Connection):
+    """把已有的JSON文本转换为 JSON_STORAGE_FUNC 的存储格式，不合法的JSON保持原样"""
+    for table, column in _JSON_COLUMNS:
+        if column not in _table_columns(conn, table):
+            continue
+        conn.execute(f"""
+            UPDATE {table} SET {column} = {JSON_STORAGE_FUNC}({column})
+            WHERE typeof({column}) = 'text' AND json_valid({column})
+        """)
+
 class Migration:
     """单个迁移类"""
 
-    def __init__(self, version: str, description: str, up_sql: str, down_sql: str = ""):
+    def __init__(self, version: str, description: str, up_sql: str, down_sql: str = "",
+                 indexes_sql: str = "", up_func: Optional[Callable[[sqlite3.Connection], None]] = None):
         self.version = version
         self.description = description
         self.up_sql = up_sql
         self.down_sql = down_sql
+        # 无法用静态SQL表达的迁移（如按现有列重建表），在up_sql之后执行
+        self.up_func = up_func
+        # 索引DDL单独存放：批量导入数据时可推迟到导入完成后再建索引
+        self.indexes_sql = indexes_sql
         self.applied_at = None
 
 class DatabaseMigrator:
     """数据库迁移器"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, defer_indexes: bool = False):
         self.db_path = Path(db_path)
         self.migrations: List[Migration] = []
+        # 为True时迁移只建表不建索引；数据导入后以默认设置再次调用 migrate_up 即补建索引
+        self.defer_indexes = defer_indexes
         self._initialize_migrations()
 
     def _initialize_migrations(self):
@@ -49,6 +237,7 @@ class DatabaseMigrator:
                 requirements TEXT,
                 posted_date DATE,
                 job_url TEXT UNIQUE,
+                easy_apply BOOLEAN DEFAULT FALSE,
                 scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
@@ -57,6 +246,8 @@ class DatabaseMigrator:
             CREATE TABLE IF NOT EXISTS applications (
                 id TEXT PRIMARY KEY,
                 job_id TEXT,
+                job_url TEXT NOT NULL,
+                platform TEXT NOT NULL,
                 applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 status TEXT DEFAULT 'applied',
                 cover_letter TEXT,
@@ -111,7 +302,8 @@ class DatabaseMigrator:
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (job_id) REFERENCES job_listings(id)
             );
-
+            """,
+            indexes_sql="""
             -- 为快速查询添加索引
             CREATE INDEX IF NOT EXISTS idx_cover_letters_job_id ON cover_letters(job_id);
             CREATE INDEX IF NOT EXISTS idx_cover_letters_user_id ON cover_letters(user_id);
@@ -127,7 +319,8 @@ class DatabaseMigrator:
         self.migrations.append(Migration(
             version="003_add_indexes",
             description="添加查询性能优化索引",
-            up_sql="""
+            up_sql="",
+            indexes_sql="""
             -- job_listings 表索引
             CREATE INDEX IF NOT EXISTS idx_job_listings_platform ON job_listings(platform);
             CREATE INDEX IF NOT EXISTS idx_job_listings_company ON job_listings(company);
@@ -188,7 +381,8 @@ class DatabaseMigrator:
                 additional_data JSON,
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
-
+            """,
+            indexes_sql="""
             -- 添加相关索引
             CREATE INDEX IF NOT EXISTS idx_app_stats_date ON application_statistics(date);
             CREATE INDEX IF NOT EXISTS idx_app_stats_platform ON application_statistics(platform);
@@ -207,6 +401,121 @@ class DatabaseMigrator:
             """
         ))
 
+        # 迁移 005: 按职位URL查询申请记录的覆盖索引
+        self.migrations.append(Migration(
+            version="005_add_application_url_index",
+            description="添加申请记录职位URL覆盖索引",
+            up_sql="",
+            indexes_sql="""
+            -- 覆盖 check_already_applied / update_application_status / filter_applied_jobs 的
+            -- job_url 查询；job_url 是前缀列，单列查询也能使用，无需再建单列索引
+            CREATE INDEX IF NOT EXISTS idx_applications_url_status ON applications(job_url, status);
+            """,
+            down_sql="""
+            DROP INDEX IF EXISTS idx_applications_url_status;
+            """
+        ))
+
+        # 迁移 006: UUID文本主键改为INTEGER主键（不可回滚）
+        self.migrations.append(Migration(
+            version="006_integer_primary_keys",
+            description="职位和申请记录改用INTEGER主键",
+            up_sql="",
+            up_func=upgrade_to_integer_ids
+        ))
+
+        # 迁移 007: JSON列改存JSONB（SQLite 3.45以下为压缩后的JSON文本）
+        self.migrations.append(Migration(
+            version="007_jsonb_columns",
+            description="JSON列改为JSONB存储",
+            up_sql="",
+            up_func=convert_json_columns
+        ))
+
+        # 迁移 008: 删除 DatabaseManager 自建表时留下的重复索引
+        self.migrations.append(Migration(
+            version="008_drop_legacy_indexes",
+            description="删除与迁移索引重复的旧索引",
+            up_sql="""
+            -- job_url 已有UNIQUE约束的自动索引；status / applied_at 与迁移003的索引重复
+            DROP INDEX IF EXISTS idx_job_url;
+            DROP INDEX IF EXISTS idx_application_status;
+            DROP INDEX IF EXISTS idx_application_date;
+            """
+        ))
+
+        # 迁移 009: 职位全文检索（FTS5外部内容表，由触发器与 job_listings 保持同步）
+        self.migrations.append(Migration(
+            version="009_add_job_listings_fts",
+            description="添加职位全文检索索引",
+            up_sql="""
+            CREATE VIRTUAL TABLE IF NOT EXISTS job_listings_fts USING fts5(
+                title, job_description, requirements,
+                content='job_listings', content_rowid='id',
+                tokenize='porter unicode61'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS job_listings_fts_ai AFTER INSERT ON job_listings BEGIN
+                INSERT INTO job_listings_fts(rowid, title, job_description, requirements)
+                VALUES (new.id, new.title, new.job_description, new.requirements);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS job_listings_fts_ad AFTER DELETE ON job_listings BEGIN
+                INSERT INTO job_listings_fts(job_listings_fts, rowid, title, job_description, requirements)
+                VALUES ('delete', old.id, old.title, old.job_description, old.requirements);
+            END;
+
+            -- 只有检索列变化时才重建索引条目，更新 scraped_at 等其他列不触发
+            CREATE TRIGGER IF NOT EXISTS job_listings_fts_au
+            AFTER UPDATE OF title, job_description, requirements ON job_listings BEGIN
+                INSERT INTO job_listings_fts(job_listings_fts, rowid, title, job_description, requirements)
+                VALUES ('delete', old.id, old.title, old.job_description, old.requirements);
+                INSERT INTO job_listings_fts(rowid, title, job_description, requirements)
+                VALUES (new.id, new.title, new.job_description, new.requirements);
+            END;
+
+            -- 为已有职位建立索引
+            INSERT INTO job_listings_fts(job_listings_fts) VALUES ('rebuild');
+            """,
+            down_sql="""
+            DROP TRIGGER IF EXISTS job_listings_fts_au;
+            DROP TRIGGER IF EXISTS job_listings_fts_ad;
+            DROP TRIGGER IF EXISTS job_listings_fts_ai;
+            DROP TABLE IF EXISTS job_listings_fts;
+            """
+        ))
+
+        # 迁移 010: 与常用查询的 WHERE / ORDER BY 对应的组合索引
+        self.migrations.append(Migration(
+            version="010_add_composite_indexes",
+            description="添加组合索引",
+            up_sql="",
+            indexes_sql="""
+            -- get_recent_jobs: platform = ? AND scraped_at >= ? ORDER BY scraped_at DESC
+            CREATE INDEX IF NOT EXISTS idx_job_listings_platform_scraped ON job_listings(platform, scraped_at DESC);
+            -- get_jobs_by_company: company = ? ORDER BY posted_date DESC
+            CREATE INDEX IF NOT EXISTS idx_job_listings_company_posted ON job_listings(company, posted_date DESC);
+            -- get_applications_by_status / 按状态筛选的申请列表: status = ? ORDER BY applied_at DESC
+            CREATE INDEX IF NOT EXISTS idx_applications_status_applied ON applications(status, applied_at DESC);
+
+            -- 单列索引已是上面组合索引的前缀，保留只会增加写入开销
+            DROP INDEX IF EXISTS idx_job_listings_platform;
+            DROP INDEX IF EXISTS idx_job_listings_company;
+            DROP INDEX IF EXISTS idx_applications_status;
+            """,
+            down_sql="""
+            CREATE INDEX IF NOT EXISTS idx_job_listings_platform ON job_listings(platform);
+            CREATE INDEX IF NOT EXISTS idx_job_listings_company ON job_listings(company);
+            CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+            DROP INDEX IF EXISTS idx_job_listings_platform_scraped;
+            DROP INDEX IF EXISTS idx_job_listings_company_posted;
+            DROP INDEX IF EXISTS idx_applications_status_applied;
+            """
+        ))
+
+        # 按版本号排序，migrate_up / migrate_down 依赖这一顺序
+        self.migrations.sort(key=attrgetter("version"))
+
     async def create_migration_table(self, conn: sqlite3.Connection):
         """创建迁移记录表"""
         conn.execute("""
@@ -218,22 +527,27 @@ class DatabaseMigrator:
         """)
         conn.commit()
 
-    async def get_applied_migrations(self, conn: sqlite3.Connection) -> List[str]:
+    async def get_applied_migrations(self, conn: sqlite3.Connection) -> Set[str]:
         """获取已应用的迁移版本"""
         try:
-            cursor = conn.execute("SELECT version FROM schema_migrations ORDER BY applied_at")
-            return [row[0] for row in cursor.fetchall()]
+            cursor = conn.execute("SELECT version FROM schema_migrations")
+            return {row[0] for row in cursor.fetchall()}
         except sqlite3.OperationalError:
-            # 迁移表不存在，返回空列表
-            return []
+            # 迁移表不存在，返回空集合
+            return set()
 
     async def apply_migration(self, conn: sqlite3.Connection, migration: Migration):
         """应用单个迁移"""
         try:
             logger.info(f"应用迁移: {migration.version} - {migration.description}")
 
-            # 执行迁移SQL
-            conn.executescript(migration.up_sql)
+            # 迁移SQL和迁移记录在同一个事务中，失败时整体回滚
+            conn.execute("BEGIN IMMEDIATE")
+            _execute_script(conn, migration.up_sql)
+            if migration.up_func is not None:
+                migration.up_func(conn)
+            if migration.indexes_sql and not self.defer_indexes:
+                _execute_script(conn, migration.indexes_sql)
 
             # 记录迁移
             conn.execute(
@@ -259,7 +573,8 @@ class DatabaseMigrator:
             logger.info(f"回滚迁移: {migration.version} - {migration.description}")
 
             # 执行回滚SQL
-            conn.executescript(migration.down_sql)
+            conn.execute("BEGIN IMMEDIATE")
+            _execute_script(conn, migration.down_sql)
 
             # 删除迁移记录
             conn.execute("DELETE FROM schema_migrations WHERE version = ?", (migration.version,))
@@ -272,32 +587,70 @@ class DatabaseMigrator:
             logger.error(f"迁移 {migration.version} 回滚失败: {e}")
             raise
 
-    async def migrate_up(self, target_version: str = None):
-        """向上迁移到指定版本（或最新版本）"""
+    async def migrate_up(self, target_version: str = None, defer_indexes: Optional[bool] = None):
+        """向上迁移到指定版本（或最新版本）
+
+        Args:
+            target_version: 目标版本，为空时迁移到最新版本
+            defer_indexes: 是否推迟创建索引，为空时沿用迁移器的设置；不推迟时
+                同时补建此前推迟的索引
+        """
+        if defer_indexes is not None:
+            self.defer_indexes = defer_indexes
+
         conn = sqlite3.connect(self.db_path)
 
         try:
             await self.create_migration_table(conn)
             applied_migrations = await self.get_applied_migrations(conn)
+            applied_any = False
 
+            # 迁移列表按版本有序，超过目标版本即可停止
             for migration in self.migrations:
+                if target_version and migration.version > target_version:
+                    break
                 if migration.version in applied_migrations:
                     continue
+                await self.apply_migration(conn, migration)
+                applied_any = True
 
-                if target_version and migration.version == target_version:
-                    await self.apply_migration(conn, migration)
-                    break
-                elif not target_version:
-                    await self.apply_migration(conn, migration)
-                elif migration.version == target_version:
-                    await self.apply_migration(conn, migration)
-                    break
+            if not self.defer_indexes and self._create_deferred_indexes(conn, applied_migrations):
+                applied_any = True
+
+            # 结构有变化时收集一次统计信息，首次查询前查询规划器就有真实的sqlite_stat1
+            if applied_any:
+                conn.execute("ANALYZE")
+                conn.commit()
 
             logger.info("数据库迁移完成")
 
         finally:
             conn.close()
 
+    def _create_deferred_indexes(self, conn: sqlite3.Connection, applied_migrations: Set[str]) -> bool:
+        """为已应用的迁移补建被推迟的索引，返回索引是否有变化
+
+        按版本顺序重放各迁移的索引语句（均为 IF NOT EXISTS / IF EXISTS），
+        后续迁移删除的索引会被再次删除，索引都已存在时不做任何改动。
+        """
+        index_names_sql = "SELECT name FROM sqlite_master WHERE type = 'index'"
+        before = {row[0] for row in conn.execute(index_names_sql)}
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for migration in self.migrations:
+                if migration.indexes_sql and migration.version in applied_migrations:
+                    _execute_script(conn, migration.indexes_sql)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        after = {row[0] for row in conn.execute(index_names_sql)}
+        if after != before:
+            logger.info("推迟的索引创建完成")
+        return after != before
+
     async def migrate_down(self, target_version: str):
         """向下回滚到指定版本"""
         conn = sqlite3.connect(self.db_path)
@@ -334,7 +687,7 @@ class DatabaseMigrator:
                 'total_migrations': len(self.migrations),
                 'applied_migrations': len(applied_migrations),
                 'pending_migrations': [],
-                'applied_list': applied_migrations
+                'applied_list': sorted(applied_migrations)
             }
 
             for migration in self.migrations:
@@ -350,8 +703,8 @@ class DatabaseMigrator:
             conn.close()
 
     def add_migration(self, migration: Migration):
-        """添加新迁移"""
-        self.migrations.append(migration)
+        """添加新迁移（按版本插入，保持迁移列表有序）"""
+        bisect.insort(self.migrations, migration, key=attrgetter("version"))
 
     async def create_migration_file(self, description: str) -> str:
         """创建新的迁移文件模板"""
@@ -379,9 +732,9 @@ migration = Migration(
         return template
 
 # 便捷函数
-async def migrate_database(db_path: str, target_version: str = None):
+async def migrate_database(db_path: str, target_version: str = None, defer_indexes: bool = False):
     """迁移数据库到指定版本"""
-    migrator = DatabaseMigrator(db_path)
+    migrator = DatabaseMigrator(db_path, defer_indexes=defer_indexes)
     await migrator.migrate_up(target_version)
 
 async def get_database_status(db_path: str) -> Dict:
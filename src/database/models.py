@@ -4,15 +4,68 @@
 """
 
 import aiosqlite
+import asyncio
 import json
-import uuid
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import logging
 
+from src.database.migrations import JSON_STORAGE_FUNC, DatabaseMigrator
+
 logger = logging.getLogger(__name__)
 
+# 连接级PRAGMA：只对当前连接生效，每次打开连接都需要重新设置
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",      # WAL模式下只在检查点时fsync
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",       # 约64MB页缓存
+    "PRAGMA mmap_size=268435456",     # 256MB内存映射读
+    "PRAGMA foreign_keys=ON",
+)
+
+# 高频语句：以模块常量复用同一SQL文本，长连接上由sqlite3语句缓存直接命中已编译的语句
+_STATEMENT_CACHE_SIZE = 256
+_SQL_INSERT_APPLICATION = f"""
+    INSERT INTO applications (
+        job_id, job_url, platform, status, cover_letter, application_answers, notes
+    )
+    SELECT (SELECT id FROM job_listings WHERE job_url = ?), ?, ?, ?, ?, {JSON_STORAGE_FUNC}(?), ?
+"""
+_SQL_UPDATE_APPLICATION_STATUS = """
+    UPDATE applications
+    SET status = ?, notes = COALESCE(?, notes)
+    WHERE job_url = ?
+"""
+# 申请记录查询列：JSON列以 json() 读出为文本，调用方拿到的仍是JSON字符串
+_APPLICATION_COLUMNS = """
+    a.id, a.job_id, a.job_url, a.platform, a.applied_at, a.status, a.cover_letter,
+    a.custom_resume, json(a.application_answers) AS application_answers, a.notes
+"""
+_SQL_JOB_BY_URL = "SELECT * FROM job_listings WHERE job_url = ?"
+_SQL_ALREADY_APPLIED = "SELECT 1 FROM applications WHERE job_url = ? LIMIT 1"
+_SQL_COMPANY_FILTER = "SELECT filter_type FROM company_filters WHERE company_name = ?"
+
+# applied_at 由 CURRENT_TIMESTAMP 写入，是UTC时间的 "YYYY-MM-DD HH:MM:SS" 文本
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _since_timestamp(days_back: int) -> str:
+    """days_back 天前的UTC时间，格式与 CURRENT_TIMESTAMP 一致，可直接与时间列做索引范围比较"""
+    return (datetime.now(timezone.utc) - timedelta(days=days_back)).strftime(_TIMESTAMP_FORMAT)
+
+# 报告中各申请状态的图标
+_STATUS_EMOJIS = {
+    "applied": "📝", "viewed": "👀", "interview": "🎯",
+    "offer": "🎉", "rejected": "❌", "pending": "⏳"
+}
+
+# 流式读取时每次从工作线程取回的行数：逐行迭代会为每一行往返一次线程
+_STREAM_BATCH_SIZE = 256
+
+# 长连接上定期执行 PRAGMA optimize 的间隔（秒）
+_OPTIMIZE_INTERVAL = 15 * 60
+
 class DatabaseManager:
     """数据库管理器"""
 
@@ -20,87 +73,97 @@ class DatabaseManager:
         self.db_path = db_path
         # 确保数据库目录存在
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # 长连接：首次使用时打开，所有方法复用，避免每次调用重新打开数据库
+        self._db: Optional[aiosqlite.Connection] = None
+        # SQLite同一时间只允许一个写事务，共享连接上的写操作需串行执行
+        self._lock = asyncio.Lock()
+        self._optimize_task: Optional[asyncio.Task] = None
+        # 已确认申请过的职位URL（initialize时加载）：只作命中的快速路径。
+        # DatabaseQueries或其他进程写入的申请不会进入这里，未命中时仍需查询数据库
+        self._applied_urls: Optional[set] = None
+
+    async def _connection(self) -> aiosqlite.Connection:
+        """获取长连接，首次调用时打开并应用连接级PRAGMA"""
+        if self._db is None:
+            async with self._lock:
+                if self._db is None:
+                    db = await aiosqlite.connect(self.db_path, cached_statements=_STATEMENT_CACHE_SIZE)
+                    for pragma in _CONNECTION_PRAGMAS:
+                        await db.execute(pragma)
+                    # 结果行由C实现的Row构造，既可按下标也可按列名访问
+                    db.row_factory = aiosqlite.Row
+                    self._db = db
+        return self._db
+
+    @asynccontextmanager
+    async def _reader(self):
+        """读操作使用的连接"""
+        yield await self._connection()
+
+    @asynccontextmanager
+    async def _writer(self):
+        """写操作使用的连接，持有写锁；出错时回滚，避免事务残留在共享连接上"""
+        db = await self._connection()
+        async with self._lock:
+            try:
+                yield db
+            except Exception:
+                await db.rollback()
+                raise
+
+    def _migrate(self):
+        """在工作线程中把数据库迁移到最新结构（迁移器使用同步sqlite3连接）"""
+        asyncio.run(DatabaseMigrator(self.db_path).migrate_up())
 
     async def initialize(self):
-        """初始化数据库表结构"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # 创建职位信息表
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS job_listings (
-                    id TEXT PRIMARY KEY,
-                    platform TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    company TEXT NOT NULL,
-                    location TEXT,
-                    salary_range TEXT,
-                    job_description TEXT,
-                    requirements TEXT,
-                    posted_date DATE,
-                    job_url TEXT UNIQUE,
-                    easy_apply BOOLEAN DEFAULT FALSE,
-                    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # 创建申请记录表
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS applications (
-                    id TEXT PRIMARY KEY,
-                    job_id TEXT,
-                    job_url TEXT NOT NULL,
-                    platform TEXT NOT NULL,
-                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'applied',
-                    cover_letter TEXT,
-                    custom_resume TEXT,
-                    application_answers TEXT,
-                    notes TEXT,
-                    FOREIGN KEY (job_id) REFERENCES job_listings (id)
-                )
-            """)
-
-            # 创建用户配置表
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS user_profiles (
-                    id TEXT PRIMARY KEY,
-                    platform TEXT NOT NULL,
-                    profile_data TEXT,
-                    preferences TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # 创建公司过滤表
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS company_filters (
-                    company_name TEXT PRIMARY KEY,
-                    filter_type TEXT NOT NULL,
-                    reason TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        """初始化数据库表结构
+
+        表结构只由迁移系统定义，这里执行未应用的迁移；DatabaseManager 早期自建的表
+        （没有迁移记录）也会由迁移补齐列和索引。
+        """
+        await asyncio.to_thread(self._migrate)
 
-            # 创建索引
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_job_url ON job_listings(job_url)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_application_status ON applications(status)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_application_date ON applications(applied_at)")
+        async with self._writer() as db:
+            # WAL日志模式会持久化到数据库文件，读写互不阻塞；内存数据库不支持
+            if self.db_path != ":memory:":
+                await db.execute("PRAGMA journal_mode=WAL")
 
-            await db.commit()
+            cursor = await db.execute("SELECT DISTINCT job_url FROM applications")
+            cursor.arraysize = _STREAM_BATCH_SIZE
+            self._applied_urls = {row[0] async for row in cursor}
             logger.info("数据库初始化完成")
 
-    async def save_job_listing(self, job_data: Dict[str, Any]) -> str:
+        # 长连接持续运行，定期让SQLite按需更新统计信息，避免查询计划随数据增长退化
+        if self._optimize_task is None:
+            self._optimize_task = asyncio.create_task(self._periodic_optimize())
+
+    async def _periodic_optimize(self):
+        """定期执行 PRAGMA optimize"""
+        while True:
+            await asyncio.sleep(_OPTIMIZE_INTERVAL)
+            try:
+                async with self._writer() as db:
+                    await db.execute("PRAGMA optimize")
+            except Exception as e:
+                logger.error(f"数据库优化失败: {e}")
+
+    async def save_job_listing(self, job_data: Dict[str, Any]) -> Optional[int]:
         """保存职位信息"""
-        try:
-            job_id = str(uuid.uuid4())
+        job_ids = await self.save_job_listings([job_data])
+        return job_ids[0] if job_ids else None
 
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    INSERT OR REPLACE INTO job_listings (
-                        id, platform, title, company, location, salary_range,
-                        job_description, requirements, job_url, easy_apply
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    job_id,
+    async def save_job_listings(self, jobs: List[Dict[str, Any]]) -> List[int]:
+        """批量保存职位信息（单个事务，只提交一次）
+
+        Returns:
+            与输入顺序一致的职位ID列表，失败时返回空列表
+        """
+        if not jobs:
+            return []
+
+        try:
+            rows = [
+                (
                     job_data.get('platform', ''),
                     job_data.get('title', ''),
                     job_data.get('company', ''),
@@ -110,71 +173,144 @@ class DatabaseManager:
                     job_data.get('requirements', ''),
                     job_data.get('url', ''),
                     job_data.get('easy_apply', False)
-                ))
+                )
+                for job_data in jobs
+            ]
+
+            job_ids = []
+
+            async with self._writer() as db:
+                # 按job_url原地更新已有职位：保留原ID，申请记录的job_id关联不会断开；
+                # 新职位的ID由SQLite按rowid分配
+                for row in rows:
+                    cursor = await db.execute("""
+                        INSERT INTO job_listings (
+                            platform, title, company, location, salary_range,
+                            job_description, requirements, job_url, easy_apply
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(job_url) DO UPDATE SET
+                            platform = excluded.platform,
+                            title = excluded.title,
+                            company = excluded.company,
+                            location = excluded.location,
+                            salary_range = excluded.salary_range,
+                            job_description = excluded.job_description,
+                            requirements = excluded.requirements,
+                            easy_apply = excluded.easy_apply,
+                            scraped_at = CURRENT_TIMESTAMP
+                        RETURNING id
+                    """, row)
+                    result = await cursor.fetchone()
+                    job_ids.append(result[0])
+
                 await db.commit()
 
-            logger.info(f"保存职位信息: {job_data.get('title')} at {job_data.get('company')}")
-            return job_id
+            if len(jobs) == 1:
+                logger.info(f"保存职位信息: {jobs[0].get('title')} at {jobs[0].get('company')}")
+            else:
+                logger.info(f"批量保存职位信息: {len(jobs)} 条")
+            return job_ids
 
         except Exception as e:
             logger.error(f"保存职位信息失败: {e}")
-            return ""
+            return []
 
     async def save_application(self, job_url: str, platform: str, status: str = "applied",
-                              cover_letter: str = "", notes: str = "") -> str:
+                              cover_letter: str = "", notes: str = "",
+                              answers: Optional[Dict[str, Any]] = None) -> Optional[int]:
         """保存申请记录"""
-        try:
-            app_id = str(uuid.uuid4())
+        app_ids = await self.save_applications([{
+            'job_url': job_url,
+            'platform': platform,
+            'status': status,
+            'cover_letter': cover_letter,
+            'answers': answers,
+            'notes': notes
+        }])
+        return app_ids[0] if app_ids else None
+
+    async def save_applications(self, applications: List[Dict[str, Any]]) -> List[int]:
+        """批量保存申请记录（单个事务，只提交一次）
+
+        Args:
+            applications: 申请记录列表，字段同 save_application 的参数
+
+        Returns:
+            与输入顺序一致的申请ID列表，失败时返回空列表
+        """
+        if not applications:
+            return []
 
-            # 查找对应的job_id
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("SELECT id FROM job_listings WHERE job_url = ?", (job_url,))
-                result = await cursor.fetchone()
-                job_id = result[0] if result else None
+        try:
+            rows = [
+                (
+                    application['job_url'],
+                    application['job_url'],
+                    application['platform'],
+                    application.get('status', 'applied'),
+                    application.get('cover_letter', ''),
+                    json.dumps(application['answers'], ensure_ascii=False) if application.get('answers') else None,
+                    application.get('notes', '')
+                )
+                for application in applications
+            ]
 
-                await db.execute("""
-                    INSERT INTO applications (
-                        id, job_id, job_url, platform, status, cover_letter, notes
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (app_id, job_id, job_url, platform, status, cover_letter, notes))
+            app_ids = []
 
+            async with self._writer() as db:
+                # 对应的job_id由子查询在引擎内解析，无需先查询再插入；申请ID即新行的rowid
+                for row in rows:
+                    cursor = await db.execute(_SQL_INSERT_APPLICATION, row)
+                    app_ids.append(cursor.lastrowid)
                 await db.commit()
 
-            logger.info(f"保存申请记录: {job_url} - {status}")
-            return app_id
+            if self._applied_urls is not None:
+                self._applied_urls.update(row[0] for row in rows)
+
+            if len(applications) == 1:
+                logger.info(f"保存申请记录: {applications[0]['job_url']} - {applications[0].get('status', 'applied')}")
+            else:
+                logger.info(f"批量保存申请记录: {len(applications)} 条")
+            return app_ids
 
         except Exception as e:
             logger.error(f"保存申请记录失败: {e}")
-            return ""
-
-    async def get_applications(self, status_filter: str = "all", days_back: int = 30) -> List[Dict]:
-        """获取申请记录"""
-        try:
-            since_date = datetime.now() - timedelta(days=days_back)
-
-            async with aiosqlite.connect(self.db_path) as db:
-                if status_filter == "all":
-                    cursor = await db.execute("""
-                        SELECT a.*, j.title, j.company
-                        FROM applications a
-                        LEFT JOIN job_listings j ON a.job_id = j.id
-                        WHERE a.applied_at >= ?
-                        ORDER BY a.applied_at DESC
-                    """, (since_date,))
-                else:
-                    cursor = await db.execute("""
-                        SELECT a.*, j.title, j.company
-                        FROM applications a
-                        LEFT JOIN job_listings j ON a.job_id = j.id
-                        WHERE a.status = ? AND a.applied_at >= ?
-                        ORDER BY a.applied_at DESC
-                    """, (status_filter, since_date))
+            return []
 
-                rows = await cursor.fetchall()
+    async def iter_applications(self, status_filter: str = "all",
+                                days_back: int = 30) -> AsyncIterator[aiosqlite.Row]:
+        """流式获取申请记录，按批从游标取行，不在内存中物化整个结果集"""
+        since_date = _since_timestamp(days_back)
 
-                # 转换为字典列表
-                columns = [description[0] for description in cursor.description]
-                applications = [dict(zip(columns, row)) for row in rows]
+        async with self._reader() as db:
+            if status_filter == "all":
+                cursor = await db.execute(f"""
+                    SELECT {_APPLICATION_COLUMNS}, j.title, j.company
+                    FROM applications a
+                    LEFT JOIN job_listings j ON a.job_id = j.id
+                    WHERE a.applied_at >= ?
+                    ORDER BY a.applied_at DESC
+                """, (since_date,))
+            else:
+                cursor = await db.execute(f"""
+                    SELECT {_APPLICATION_COLUMNS}, j.title, j.company
+                    FROM applications a
+                    LEFT JOIN job_listings j ON a.job_id = j.id
+                    WHERE a.status = ? AND a.applied_at >= ?
+                    ORDER BY a.applied_at DESC
+                """, (status_filter, since_date))
+
+            cursor.arraysize = _STREAM_BATCH_SIZE
+            try:
+                async for row in cursor:
+                    yield row
+            finally:
+                await cursor.close()
+
+    async def get_applications(self, status_filter: str = "all", days_back: int = 30) -> List[aiosqlite.Row]:
+        """获取申请记录（按列名访问的Row列表，需要可变字典时由调用方 dict(row) 转换）"""
+        try:
+            applications = [row async for row in self.iter_applications(status_filter, days_back)]
 
             logger.info(f"获取申请记录: {len(applications)} 条")
             return applications
@@ -186,12 +322,8 @@ class DatabaseManager:
     async def update_application_status(self, job_url: str, status: str, notes: str = "") -> bool:
         """更新申请状态"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("""
-                    UPDATE applications
-                    SET status = ?, notes = COALESCE(?, notes)
-                    WHERE job_url = ?
-                """, (status, notes, job_url))
+            async with self._writer() as db:
+                cursor = await db.execute(_SQL_UPDATE_APPLICATION_STATUS, (status, notes, job_url))
 
                 await db.commit()
                 success = cursor.rowcount > 0
@@ -207,18 +339,12 @@ class DatabaseManager:
             logger.error(f"更新申请状态失败: {e}")
             return False
 
-    async def get_job_by_url(self, job_url: str) -> Optional[Dict]:
+    async def get_job_by_url(self, job_url: str) -> Optional[aiosqlite.Row]:
         """根据URL获取职位信息"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("SELECT * FROM job_listings WHERE job_url = ?", (job_url,))
-                row = await cursor.fetchone()
-
-                if row:
-                    columns = [description[0] for description in cursor.description]
-                    return dict(zip(columns, row))
-
-            return None
+            async with self._reader() as db:
+                cursor = await db.execute(_SQL_JOB_BY_URL, (job_url,))
+                return await cursor.fetchone()
 
         except Exception as e:
             logger.error(f"获取职位信息失败: {e}")
@@ -226,11 +352,18 @@ class DatabaseManager:
 
     async def check_already_applied(self, job_url: str) -> bool:
         """检查是否已申请该职位"""
+        if self._applied_urls is not None and job_url in self._applied_urls:
+            return True
+
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("SELECT COUNT(*) FROM applications WHERE job_url = ?", (job_url,))
-                result = await cursor.fetchone()
-                return result[0] > 0 if result else False
+            async with self._reader() as db:
+                # 命中第一条索引记录即可返回，无需统计全部匹配行
+                cursor = await db.execute(_SQL_ALREADY_APPLIED, (job_url,))
+                applied = await cursor.fetchone() is not None
+
+            if applied and self._applied_urls is not None:
+                self._applied_urls.add(job_url)
+            return applied
 
         except Exception as e:
             logger.error(f"检查申请状态失败: {e}")
@@ -239,7 +372,7 @@ class DatabaseManager:
     async def add_company_filter(self, company_name: str, filter_type: str, reason: str = ""):
         """添加公司过滤规则"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._writer() as db:
                 await db.execute("""
                     INSERT OR REPLACE INTO company_filters (company_name, filter_type, reason)
                     VALUES (?, ?, ?)
@@ -254,10 +387,8 @@ class DatabaseManager:
     async def is_company_filtered(self, company_name: str) -> Optional[str]:
         """检查公司是否被过滤"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("""
-                    SELECT filter_type FROM company_filters WHERE company_name = ?
-                """, (company_name,))
+            async with self._reader() as db:
+                cursor = await db.execute(_SQL_COMPANY_FILTER, (company_name,))
                 result = await cursor.fetchone()
                 return result[0] if result else None
 
@@ -268,100 +399,126 @@ class DatabaseManager:
     async def generate_report(self, days_back: int = 30) -> str:
         """生成申请报告"""
         try:
-            applications = await self.get_applications("all", days_back)
+            platforms, statuses, companies = await self._fetch_report_data(days_back)
 
-            if not applications:
+            if not platforms:
                 return f"📊 过去 {days_back} 天内暂无申请记录"
 
-            # 统计数据
-            total = len(applications)
-            platforms = {}
-            statuses = {}
-            companies = {}
-
-            for app in applications:
-                platform = app.get('platform', 'unknown')
-                status = app.get('status', 'unknown')
-                company = app.get('company', 'unknown')
-
-                platforms[platform] = platforms.get(platform, 0) + 1
-                statuses[status] = statuses.get(status, 0) + 1
-                companies[company] = companies.get(company, 0) + 1
-
-            # 生成报告
-            report = f"# 📊 申请活动报告 ({days_back} 天)\n\n"
-            report += f"**总申请数**: {total}\n\n"
-
-            # 平台分析
-            report += "## 📈 平台分布\n"
-            for platform, count in sorted(platforms.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / total) * 100
-                report += f"- **{platform.title()}**: {count} 份 ({percentage:.1f}%)\n"
-
-            # 状态分析
-            report += "\n## 📋 申请状态\n"
-            status_emojis = {
-                "applied": "📝", "viewed": "👀", "interview": "🎯",
-                "offer": "🎉", "rejected": "❌", "pending": "⏳"
-            }
-            for status, count in sorted(statuses.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / total) * 100
-                emoji = status_emojis.get(status, "📋")
-                report += f"- {emoji} **{status.title()}**: {count} 份 ({percentage:.1f}%)\n"
-
-            # 成功率分析
-            interviews = statuses.get('interview', 0)
-            offers = statuses.get('offer', 0)
-            interview_rate = (interviews / total) * 100
-            offer_rate = (offers / total) * 100
-
-            report += "\n## 🎯 成功率分析\n"
-            report += f"- **面试邀请率**: {interview_rate:.1f}% ({interviews}/{total})\n"
-            report += f"- **Offer获得率**: {offer_rate:.1f}% ({offers}/{total})\n"
-
-            # 热门公司
-            if companies:
-                report += "\n## 🏢 申请公司分布 (Top 5)\n"
-                top_companies = sorted(companies.items(), key=lambda x: x[1], reverse=True)[:5]
-                for company, count in top_companies:
-                    report += f"- **{company}**: {count} 份\n"
-
-            # 改进建议
-            report += "\n## 💡 改进建议\n"
-            if interview_rate < 10:
-                report += "- 考虑优化简历关键词匹配度\n"
-                report += "- 提高求职信个性化程度\n"
-            if offer_rate < 5:
-                report += "- 加强面试准备和技能提升\n"
-                report += "- 针对目标公司做更深入研究\n"
-
-            return report
+            # 拼接Markdown是纯Python计算，放到工作线程执行，不占用事件循环
+            return await asyncio.to_thread(self._format_report, platforms, statuses, companies, days_back)
 
         except Exception as e:
             logger.error(f"生成报告失败: {e}")
             return f"生成报告失败: {str(e)}"
 
+    async def _fetch_report_data(self, days_back: int) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+        """查询报告所需的统计数据：平台、状态、公司（Top 5）的申请计数"""
+        since_date = _since_timestamp(days_back)
+
+        # 统计数据：在SQL中分组计数，只传回各分组的计数行
+        async with self._reader() as db:
+            platform_cursor, status_cursor, company_cursor = await asyncio.gather(
+                db.execute("""
+                    SELECT platform, COUNT(*) FROM applications
+                    WHERE applied_at >= ?
+                    GROUP BY platform
+                    ORDER BY COUNT(*) DESC, MAX(applied_at) DESC, MAX(rowid) DESC
+                """, (since_date,)),
+                db.execute("""
+                    SELECT status, COUNT(*) FROM applications
+                    WHERE applied_at >= ?
+                    GROUP BY status
+                    ORDER BY COUNT(*) DESC, MAX(applied_at) DESC, MAX(rowid) DESC
+                """, (since_date,)),
+                db.execute("""
+                    SELECT j.company, COUNT(*)
+                    FROM applications a
+                    LEFT JOIN job_listings j ON a.job_id = j.id
+                    WHERE a.applied_at >= ?
+                    GROUP BY j.company
+                    ORDER BY COUNT(*) DESC, MAX(a.applied_at) DESC, MAX(a.rowid) DESC
+                    LIMIT 5
+                """, (since_date,))
+            )
+            platforms = dict(await platform_cursor.fetchall())
+            statuses = dict(await status_cursor.fetchall())
+            companies = dict(await company_cursor.fetchall())
+
+        return platforms, statuses, companies
+
+    @staticmethod
+    def _format_report(platforms: Dict[str, int], statuses: Dict[str, int],
+                       companies: Dict[str, int], days_back: int) -> str:
+        """把统计数据格式化为Markdown报告"""
+        total = sum(platforms.values())
+
+        # 生成报告：逐行收集后一次拼接；分组结果已按计数降序返回
+        inv_total = 100.0 / total
+        parts = [
+            f"# 📊 申请活动报告 ({days_back} 天)",
+            "",
+            f"**总申请数**: {total}",
+            "",
+            "## 📈 平台分布",
+        ]
+        parts.extend(
+            f"- **{platform.title()}**: {count} 份 ({count * inv_total:.1f}%)"
+            for platform, count in platforms.items()
+        )
+
+        # 状态分析
+        parts += ["", "## 📋 申请状态"]
+        parts.extend(
+            f"- {_STATUS_EMOJIS.get(status, '📋')} **{status.title()}**: {count} 份 ({count * inv_total:.1f}%)"
+            for status, count in statuses.items()
+        )
+
+        # 成功率分析
+        interviews = statuses.get('interview', 0)
+        offers = statuses.get('offer', 0)
+        interview_rate = interviews * inv_total
+        offer_rate = offers * inv_total
+
+        parts += [
+            "",
+            "## 🎯 成功率分析",
+            f"- **面试邀请率**: {interview_rate:.1f}% ({interviews}/{total})",
+            f"- **Offer获得率**: {offer_rate:.1f}% ({offers}/{total})",
+        ]
+
+        # 热门公司
+        if companies:
+            parts += ["", "## 🏢 申请公司分布 (Top 5)"]
+            parts.extend(f"- **{company}**: {count} 份" for company, count in companies.items())
+
+        # 改进建议
+        parts += ["", "## 💡 改进建议"]
+        if interview_rate < 10:
+            parts += ["- 考虑优化简历关键词匹配度", "- 提高求职信个性化程度"]
+        if offer_rate < 5:
+            parts += ["- 加强面试准备和技能提升", "- 针对目标公司做更深入研究"]
+
+        parts.append("")
+        return "\n".join(parts)
+
     async def filter_applied_jobs(self, job_urls: List[str]) -> List[str]:
         """过滤已申请的职位URL"""
         try:
             if not job_urls:
                 return []
 
-            # 构建SQL IN子句的占位符
-            placeholders = ",".join("?" * len(job_urls))
-
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute(f"""
-                    SELECT DISTINCT j.job_url
-                    FROM applications a
-                    JOIN job_listings j ON a.job_id = j.id
-                    WHERE j.job_url IN ({placeholders})
-                """, job_urls)
-
-                applied_urls = set(row[0] for row in await cursor.fetchall())
+            # 候选URL以JSON数组整体绑定，没有参数个数限制；
+            # 直接查applications.job_url，未关联职位记录的申请也能被过滤
+            async with self._reader() as db:
+                cursor = await db.execute("""
+                    SELECT value FROM json_each(?)
+                    WHERE value NOT IN (SELECT job_url FROM applications)
+                    ORDER BY key
+                """, (json.dumps(job_urls),))
+                cursor.arraysize = _STREAM_BATCH_SIZE
 
-            # 返回未申请的职位URL
-            filtered_urls = [url for url in job_urls if url not in applied_urls]
+                # 返回未申请的职位URL
+                filtered_urls = [row[0] async for row in cursor]
 
             logger.info(f"过滤职位URL: {len(job_urls)} -> {len(filtered_urls)}")
             return filtered_urls
@@ -372,8 +529,18 @@ class DatabaseManager:
 
     async def close(self):
         """关闭数据库连接"""
-        # SQLite连接自动管理，无需显式关闭
-        pass
+        if self._optimize_task is not None:
+            self._optimize_task.cancel()
+            self._optimize_task = None
+
+        if self._db is not None:
+            try:
+                async with self._writer() as db:
+                    await db.execute("PRAGMA optimize")
+            except Exception as e:
+                logger.error(f"数据库优化失败: {e}")
+            await self._db.close()
+            self._db = None
 
 if __name__ == "__main__":
     import asyncio
@@ -3,78 +3,171 @@
 定义常用的数据库查询和复杂查询逻辑
 """
 
+import asyncio
+import copy
+import hashlib
+import queue
+import re
 import sqlite3
-from typing import List, Dict, Optional, Tuple, Any
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import cache
+from typing import List, Dict, Optional, Set, Tuple, Any
 from datetime import datetime, timedelta
 import json
 import logging
 
+from src.database.migrations import JSON_STORAGE_FUNC
+
 logger = logging.getLogger(__name__)
 
+# 每个连接的预编译语句缓存容量（默认128），查询类中的SQL全部常驻缓存
+_STATEMENT_CACHE_SIZE = 1024
+
+# 查询结果缓存：最多保存的条目数，以及报告结果的有效期（秒）
+_RESULT_CACHE_SIZE = 128
+_REPORT_CACHE_TTL = 300
+
+# 从SQL中提取读写涉及的表名，用于写操作后失效相关的缓存结果
+_TABLE_NAME_RE = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+(\w+)", re.IGNORECASE)
+
+# 多行VALUES批量插入：每条语句的默认行数，以及单条语句的绑定参数上限（SQLite 3.32+ 默认值）
+_VALUES_BATCH_SIZE = 500
+_MAX_SQL_VARIABLES = 32766
+
+# execute_many 每个事务最多写入的行数，单个事务的脏页保持在页缓存范围内
+_TRANSACTION_ROWS = 5000
+
+# 累计写入多少行后执行一次 PRAGMA optimize，让统计信息跟上数据分布的变化
+_OPTIMIZE_AFTER_ROWS = 10000
+
+_VALUES_KEYWORD_RE = re.compile(r"\bVALUES\s*\(", re.IGNORECASE)
+
+def _split_values_clause(query: str) -> Tuple[str, str, str]:
+    """把 INSERT 语句拆分为 (VALUES之前的部分, 单行占位符组, 之后的部分)
+
+    占位符组按括号配对截取，可以包含 json(?) 之类的函数调用。
+    """
+    match = _VALUES_KEYWORD_RE.search(query)
+    if match is None:
+        raise ValueError("INSERT语句中没有 VALUES (...) 子句")
+
+    start = match.end() - 1
+    depth = 0
+    for index in range(start, len(query)):
+        if query[index] == "(":
+            depth += 1
+        elif query[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return query[:match.start()], query[start:index + 1], query[index + 1:]
+    raise ValueError("VALUES 子句括号不匹配")
+
+# 连接池中每个连接创建时执行一次的PRAGMA
+_POOL_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",       # 约64MB页缓存
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",     # 256MB内存映射读
+)
+
+# 职位列表查询列：不含 job_description / requirements 这类大文本，列表视图用不到
+_JOB_SUMMARY_FIELDS = (
+    "id", "platform", "title", "company", "location", "salary_range",
+    "posted_date", "job_url", "easy_apply", "scraped_at",
+)
+_JOB_SUMMARY_COLUMNS = ", ".join(_JOB_SUMMARY_FIELDS)
+_JOB_SUMMARY_COLUMNS_J = ", ".join(f"j.{field}" for field in _JOB_SUMMARY_FIELDS)
+# 职位详情查询列
+_JOB_DETAIL_COLUMNS = _JOB_SUMMARY_COLUMNS + ", job_description, requirements, created_at"
+
+# 求职信列表查询列：不含正文
+_COVER_LETTER_SUMMARY_COLUMNS = "cl.id, cl.job_id, cl.user_id, cl.title, cl.template_used, cl.created_at, cl.updated_at"
+
+# 申请记录查询列：JSON列以 json() 读出为文本
+_APPLICATION_COLUMNS = """a.id, a.job_id, a.applied_at, a.status, a.cover_letter, a.custom_resume,
+        json(a.application_answers) AS application_answers, a.notes"""
+
 class QueryBuilder:
-    """SQL查询构建器"""
+    """SQL查询构建器
+
+    各子句追加到列表中，build() 时一次拼接。LIMIT / OFFSET 以参数绑定，
+    同一结构的查询总是生成相同的SQL文本，可以命中连接的预编译语句缓存。
+    """
 
     def __init__(self):
-        self.query = ""
+        self._parts: List[str] = []
+        self._has_where = False
         self.params = []
 
+    @property
+    def query(self) -> str:
+        return " ".join(self._parts)
+
     def select(self, columns: str = "*"):
-        self.query = f"SELECT {columns}"
+        self._parts = [f"SELECT {columns}"]
+        self._has_where = False
         return self
 
     def from_table(self, table: str):
-        self.query += f" FROM {table}"
+        self._parts.append(f"FROM {table}")
         return self
 
-    def where(self, condition: str, *params):
-        if "WHERE" not in self.query:
-            self.query += " WHERE "
-        else:
-            self.query += " AND "
-        self.query += condition
+    def _condition(self, operator: str, condition: str, params: tuple):
+        self._parts.append(operator if self._has_where else "WHERE")
+        self._parts.append(condition.strip())
+        self._has_where = True
         self.params.extend(params)
         return self
 
+    def where(self, condition: str, *params):
+        return self._condition("AND", condition, params)
+
     def or_where(self, condition: str, *params):
-        if "WHERE" not in self.query:
-            self.query += " WHERE "
-        else:
-            self.query += " OR "
-        self.query += condition
-        self.params.extend(params)
-        return self
+        return self._condition("OR", condition, params)
 
     def join(self, table: str, condition: str):
-        self.query += f" JOIN {table} ON {condition}"
+        self._parts.append(f"JOIN {table} ON {condition}")
         return self
 
     def left_join(self, table: str, condition: str):
-        self.query += f" LEFT JOIN {table} ON {condition}"
+        self._parts.append(f"LEFT JOIN {table} ON {condition}")
         return self
 
     def order_by(self, column: str, direction: str = "ASC"):
-        self.query += f" ORDER BY {column} {direction}"
+        self._parts.append(f"ORDER BY {column} {direction}")
         return self
 
     def limit(self, count: int):
-        self.query += f" LIMIT {count}"
+        self._parts.append("LIMIT ?")
+        self.params.append(count)
         return self
 
     def offset(self, count: int):
-        self.query += f" OFFSET {count}"
+        self._parts.append("OFFSET ?")
+        self.params.append(count)
         return self
 
     def group_by(self, column: str):
-        self.query += f" GROUP BY {column}"
+        self._parts.append(f"GROUP BY {column}")
         return self
 
     def having(self, condition: str, *params):
-        self.query += f" HAVING {condition}"
+        self._parts.append(f"HAVING {condition}")
         self.params.extend(params)
         return self
 
     def build(self) -> Tuple[str, List]:
-        return self.query, self.params
+        # 驻留SQL文本：相同结构的查询共享同一个字符串对象，语句缓存查找时比较更快
+        return sys.intern(self.query), self.params
+
+    def execute(self, conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """在给定连接上执行构建的查询"""
+        return conn.execute(*self.build())
 
 class JobListingsQueries:
     """职位信息查询"""
@@ -82,46 +175,80 @@ class JobListingsQueries:
     @staticmethod
     def create_job_listing() -> str:
         """创建职位记录"""
+        # 按job_url原地更新：INSERT OR REPLACE 会先删除旧行，而REPLACE删除不触发
+        # 删除触发器，全文索引中会残留旧条目；原地更新同时保留职位ID
         return """
-        INSERT OR REPLACE INTO job_listings
-        (id, platform, title, company, location, salary_range, job_description,
+        INSERT INTO job_listings
+        (platform, title, company, location, salary_range, job_description,
          requirements, posted_date, job_url, scraped_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(job_url) DO UPDATE SET
+            platform = excluded.platform,
+            title = excluded.title,
+            company = excluded.company,
+            location = excluded.location,
+            salary_range = excluded.salary_range,
+            job_description = excluded.job_description,
+            requirements = excluded.requirements,
+            posted_date = excluded.posted_date,
+            scraped_at = excluded.scraped_at
         """
 
     @staticmethod
+    @cache
     def get_job_by_url() -> str:
-        """根据URL获取职位"""
-        return """
-        SELECT * FROM job_listings
+        """根据URL获取职位（摘要列）"""
+        return f"""
+        SELECT {_JOB_SUMMARY_COLUMNS} FROM job_listings
+        WHERE job_url = ?
+        """
+
+    @staticmethod
+    @cache
+    def get_job_detail_by_url() -> str:
+        """根据URL获取职位详情（包含职位描述和要求）"""
+        return f"""
+        SELECT {_JOB_DETAIL_COLUMNS} FROM job_listings
         WHERE job_url = ?
         """
 
     @staticmethod
+    @cache
     def search_jobs_by_keywords() -> str:
-        """根据关键词搜索职位"""
-        return """
-        SELECT * FROM job_listings
-        WHERE (title LIKE ? OR job_description LIKE ? OR requirements LIKE ?)
-        AND platform = ?
-        ORDER BY scraped_at DESC
+        """根据关键词全文检索职位，按相关度排序
+
+        参数：(MATCH表达式, 平台, 数量上限)；普通关键词先用 keywords_match 转换
+        """
+        return f"""
+        SELECT {_JOB_SUMMARY_COLUMNS_J} FROM job_listings_fts
+        JOIN job_listings j ON j.id = job_listings_fts.rowid
+        WHERE job_listings_fts MATCH ?
+        AND j.platform = ?
+        ORDER BY bm25(job_listings_fts)
         LIMIT ?
         """
 
     @staticmethod
+    def keywords_match(keywords: str) -> str:
+        """把用户输入的关键词转换为FTS5短语查询，避免其中的引号、运算符被当作查询语法"""
+        return '"' + keywords.replace('"', '""') + '"'
+
+    @staticmethod
+    @cache
     def get_jobs_by_company() -> str:
         """获取指定公司的职位"""
-        return """
-        SELECT * FROM job_listings
+        return f"""
+        SELECT {_JOB_SUMMARY_COLUMNS} FROM job_listings
         WHERE company = ?
         ORDER BY posted_date DESC
         """
 
     @staticmethod
+    @cache
     def get_recent_jobs() -> str:
         """获取最近爬取的职位"""
-        return """
-        SELECT * FROM job_listings
+        return f"""
+        SELECT {_JOB_SUMMARY_COLUMNS} FROM job_listings
         WHERE scraped_at >= ?
         AND platform = ?
         ORDER BY scraped_at DESC
@@ -129,10 +256,11 @@ class JobListingsQueries:
         """
 
     @staticmethod
+    @cache
     def get_jobs_by_location() -> str:
         """按地区查询职位"""
-        return """
-        SELECT * FROM job_listings
+        return f"""
+        SELECT {_JOB_SUMMARY_COLUMNS} FROM job_listings
         WHERE location LIKE ?
         ORDER BY posted_date DESC
         """
@@ -155,29 +283,32 @@ class ApplicationQueries:
     """申请记录查询"""
 
     @staticmethod
+    @cache
     def create_application() -> str:
-        """创建申请记录"""
-        return """
+        """创建申请记录（id为整数rowid，由SQLite分配）"""
+        return f"""
         INSERT INTO applications
-        (id, job_id, applied_at, status, cover_letter, custom_resume, application_answers, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        (job_id, job_url, platform, applied_at, status, cover_letter, custom_resume, application_answers, notes)
+        VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, {JSON_STORAGE_FUNC}(?), ?)
         """
 
     @staticmethod
+    @cache
     def get_application_by_id() -> str:
         """根据ID获取申请记录"""
-        return """
-        SELECT a.*, j.title as job_title, j.company, j.platform, j.job_url
+        return f"""
+        SELECT {_APPLICATION_COLUMNS}, j.title as job_title, j.company, j.platform, j.job_url
         FROM applications a
         LEFT JOIN job_listings j ON a.job_id = j.id
         WHERE a.id = ?
         """
 
     @staticmethod
+    @cache
     def get_applications_by_status() -> str:
         """根据状态获取申请"""
-        return """
-        SELECT a.*, j.title as job_title, j.company, j.platform
+        return f"""
+        SELECT {_APPLICATION_COLUMNS}, j.title as job_title, j.company, j.platform
         FROM applications a
         LEFT JOIN job_listings j ON a.job_id = j.id
         WHERE a.status = ?
@@ -185,10 +316,11 @@ class ApplicationQueries:
         """
 
     @staticmethod
+    @cache
     def get_applications_by_date_range() -> str:
         """获取指定日期范围的申请"""
-        return """
-        SELECT a.*, j.title as job_title, j.company, j.platform, j.job_url
+        return f"""
+        SELECT {_APPLICATION_COLUMNS}, j.title as job_title, j.company, j.platform, j.job_url
         FROM applications a
         LEFT JOIN job_listings j ON a.job_id = j.id
         WHERE a.applied_at BETWEEN ? AND ?
@@ -252,19 +384,21 @@ class UserProfileQueries:
     """用户配置查询"""
 
     @staticmethod
+    @cache
     def create_or_update_profile() -> str:
         """创建或更新用户配置"""
-        return """
+        return f"""
         INSERT OR REPLACE INTO user_profiles
         (id, platform, profile_data, preferences, updated_at)
-        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        VALUES (?, ?, {JSON_STORAGE_FUNC}(?), ?, CURRENT_TIMESTAMP)
         """
 
     @staticmethod
     def get_profile_by_platform() -> str:
         """根据平台获取用户配置"""
         return """
-        SELECT * FROM user_profiles
+        SELECT id, platform, json(profile_data) AS profile_data, preferences, updated_at
+        FROM user_profiles
         WHERE platform = ?
         ORDER BY updated_at DESC
         LIMIT 1
@@ -274,7 +408,8 @@ class UserProfileQueries:
     def get_all_profiles() -> str:
         """获取所有用户配置"""
         return """
-        SELECT * FROM user_profiles
+        SELECT id, platform, json(profile_data) AS profile_data, preferences, updated_at
+        FROM user_profiles
         ORDER BY updated_at DESC
         """
 
@@ -302,7 +437,7 @@ class CompanyFilterQueries:
     def get_filtered_companies() -> str:
         """获取过滤公司列表"""
         return """
-        SELECT * FROM company_filters
+        SELECT company_name, filter_type, reason, created_at FROM company_filters
         WHERE filter_type = ?
         ORDER BY created_at DESC
         """
@@ -331,17 +466,19 @@ class CoverLetterQueries:
     def get_cover_letter_by_job() -> str:
         """根据职位ID获取求职信"""
         return """
-        SELECT * FROM cover_letters
+        SELECT id, job_id, user_id, title, content, template_used, variables, created_at, updated_at
+        FROM cover_letters
         WHERE job_id = ?
         ORDER BY created_at DESC
         LIMIT 1
         """
 
     @staticmethod
+    @cache
     def get_cover_letters_by_user() -> str:
-        """获取用户的求职信"""
-        return """
-        SELECT cl.*, jl.title as job_title, jl.company
+        """获取用户的求职信列表（不含正文，正文用 get_cover_letter_by_job 获取）"""
+        return f"""
+        SELECT {_COVER_LETTER_SUMMARY_COLUMNS}, jl.title as job_title, jl.company
         FROM cover_letters cl
         LEFT JOIN job_listings jl ON cl.job_id = jl.id
         WHERE cl.user_id = ?
@@ -416,8 +553,20 @@ class StatisticsQueries:
 class DatabaseQueries:
     """数据库查询管理类"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pool_size: int = 5):
         self.db_path = db_path
+        # 长连接池：连接按需创建，最多 pool_size 个，用完归还复用，保留SQLite页缓存和已解析的schema
+        self.pool_size = pool_size
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._created = 0
+        self._pool_lock = threading.Lock()
+        self._statistics_checked = False
+        self._rows_since_optimize = 0
+        # 只读查询结果缓存：key -> (过期时间, 结果, 依赖的表)，另记录表名 -> 依赖该表的key，
+        # 写操作后按表失效；查询在工作线程中执行，读写缓存需加锁
+        self._result_cache: "OrderedDict[Any, Tuple[float, Any, Set[str]]]" = OrderedDict()
+        self._cache_keys_by_table: Dict[str, Set[Any]] = {}
+        self._cache_lock = threading.Lock()
         self.job_listings = JobListingsQueries()
         self.applications = ApplicationQueries()
         self.user_profiles = UserProfileQueries()
@@ -425,73 +574,265 @@ class DatabaseQueries:
         self.cover_letters = CoverLetterQueries()
         self.statistics = StatisticsQueries()
 
-    def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
-        """执行查询并返回结果"""
+    def _connect(self) -> sqlite3.Connection:
+        """创建池中的新连接"""
+        # 连接会被 asyncio.to_thread 的不同工作线程取用，由连接池保证同一时间只有一个线程使用
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=_STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        for pragma in _POOL_PRAGMAS:
+            conn.execute(pragma)
+        if not self._statistics_checked:
+            self._statistics_checked = True
+            self._ensure_statistics(conn)
+        return conn
+
+    @staticmethod
+    def _ensure_statistics(conn: sqlite3.Connection):
+        """数据库还没有统计信息（sqlite_stat1为空或不存在）时执行一次 ANALYZE"""
+        try:
+            has_statistics = conn.execute("SELECT 1 FROM sqlite_stat1 LIMIT 1").fetchone() is not None
+        except sqlite3.OperationalError:
+            has_statistics = False
+        if not has_statistics:
+            conn.execute("ANALYZE")
+            conn.commit()
+
+    def _after_write(self, conn: sqlite3.Connection, affected_rows: int):
+        """累计写入行数，达到阈值时在当前连接上执行 PRAGMA optimize"""
+        with self._pool_lock:
+            self._rows_since_optimize += max(affected_rows, 1)
+            run_optimize = self._rows_since_optimize >= _OPTIMIZE_AFTER_ROWS
+            if run_optimize:
+                self._rows_since_optimize = 0
+        if run_optimize:
+            conn.execute("PRAGMA optimize")
+
+    @contextmanager
+    def _acquire(self):
+        """从连接池借出连接，用完归还；出错时回滚，避免事务残留在池中的连接上"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._created < self.pool_size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._pool_lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._pool.get()
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            results = [dict(row) for row in cursor.fetchall()]
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        """关闭连接池中的所有连接，关闭前执行 PRAGMA optimize 更新需要更新的统计信息"""
+        optimized = False
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if not optimized:
+                # 统计信息存于数据库文件中，在任意一个连接上执行一次即可
+                try:
+                    conn.execute("PRAGMA optimize")
+                    optimized = True
+                except sqlite3.Error as e:
+                    logger.error(f"数据库优化失败: {e}")
             conn.close()
-            return results
+            with self._pool_lock:
+                self._created -= 1
+
+    def _cache_get(self, key):
+        """读取未过期的缓存结果（结果由多个调用方共享，返回前需复制）"""
+        with self._cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._drop_cached(key)
+                return None
+            self._result_cache.move_to_end(key)
+            return value
+
+    def _cache_set(self, key, value, ttl: float, tables: Set[str]):
+        """写入缓存结果并登记依赖的表，超出容量时淘汰最久未使用的条目"""
+        with self._cache_lock:
+            self._drop_cached(key)
+            self._result_cache[key] = (time.monotonic() + ttl, value, tables)
+            for table in tables:
+                self._cache_keys_by_table.setdefault(table, set()).add(key)
+            while len(self._result_cache) > _RESULT_CACHE_SIZE:
+                self._drop_cached(next(iter(self._result_cache)))
+
+    def _drop_cached(self, key):
+        """移除缓存条目及其在各表索引中的登记（调用方需持有 _cache_lock）"""
+        entry = self._result_cache.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[2]:
+            keys = self._cache_keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cache_keys_by_table[table]
+
+    def _invalidate(self, query: str):
+        """写操作后失效依赖相关表的缓存结果"""
+        with self._cache_lock:
+            for table in _TABLE_NAME_RE.findall(query):
+                for key in list(self._cache_keys_by_table.get(table.lower(), ())):
+                    self._drop_cached(key)
+
+    def execute_query(self, query: str, params: tuple = (), cache_ttl: Optional[float] = None,
+                      row_as_dict: bool = True) -> List[Any]:
+        """执行查询并返回结果
+
+        Args:
+            query: SQL语句
+            params: 绑定参数
+            cache_ttl: 结果缓存有效期（秒），为空时不缓存
+            row_as_dict: 是否转换为字典；为False时直接返回 sqlite3.Row（可按下标和列名读取，
+                不可修改），省去逐行构造字典
+        """
+        try:
+            rows = None
+            if cache_ttl:
+                cache_key = hashlib.blake2b(f"{query}\x00{params!r}".encode(), digest_size=16).digest()
+                rows = self._cache_get(cache_key)
+
+            if rows is None:
+                with self._acquire() as conn:
+                    cursor = conn.execute(query, params)
+                    # 缓存不可变的 sqlite3.Row 元组，每次返回新建的列表/字典，调用方修改不影响缓存
+                    rows = tuple(cursor.fetchall())
+
+                if cache_ttl:
+                    tables = {table.lower() for table in _TABLE_NAME_RE.findall(query)}
+                    self._cache_set(cache_key, rows, cache_ttl, tables)
+
+            return [dict(row) for row in rows] if row_as_dict else list(rows)
         except Exception as e:
             logger.error(f"查询执行失败: {e}")
             raise
 
+    async def execute_query_async(self, query: str, params: tuple = (),
+                                  cache_ttl: Optional[float] = None, row_as_dict: bool = True) -> List[Any]:
+        """在工作线程中执行查询，不阻塞事件循环；并发调用各自从连接池取连接，WAL模式下可并行读取"""
+        return await asyncio.to_thread(self.execute_query, query, params, cache_ttl, row_as_dict)
+
     def execute_write(self, query: str, params: tuple = ()) -> int:
         """执行写操作并返回受影响的行数"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.execute(query, params)
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return affected_rows
+            with self._acquire() as conn:
+                cursor = conn.execute(query, params)
+                conn.commit()
+                self._after_write(conn, cursor.rowcount)
+            self._invalidate(query)
+            return cursor.rowcount
         except Exception as e:
             logger.error(f"写操作执行失败: {e}")
             raise
 
     def execute_many(self, query: str, params_list: List[tuple]) -> int:
-        """执行批量操作"""
+        """执行批量操作
+
+        每 _TRANSACTION_ROWS 行为一个事务，以 BEGIN IMMEDIATE 开始，一开始就拿到写锁，
+        避免读事务中途升级为写事务时与其他写入者冲突；WAL + synchronous=NORMAL 下提交无需fsync。
+        出错时只回滚当前事务，之前已提交的分段保留。
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.executemany(query, params_list)
-            affected_rows = cursor.rowcount
-            conn.commit()
-            conn.close()
+            affected_rows = 0
+            with self._acquire() as conn:
+                for offset in range(0, len(params_list), _TRANSACTION_ROWS):
+                    conn.execute("BEGIN IMMEDIATE")
+                    affected_rows += conn.executemany(query, params_list[offset:offset + _TRANSACTION_ROWS]).rowcount
+                    conn.commit()
+                self._after_write(conn, affected_rows)
+            self._invalidate(query)
             return affected_rows
         except Exception as e:
             logger.error(f"批量操作执行失败: {e}")
             raise
 
+    def execute_values(self, query: str, rows: List[tuple], chunk: int = _VALUES_BATCH_SIZE) -> int:
+        """以多行VALUES批量插入，整批在同一个事务中提交
+
+        query 为单行的 INSERT ... VALUES (?, ...) 语句（可带 ON CONFLICT 子句）。
+        每 chunk 行合成一条 VALUES (...), (...), ... 语句执行一次；不足 chunk 的余数行
+        用单行语句执行。两种语句都固定不变，由连接的语句缓存复用。
+        """
+        if not rows:
+            return 0
+
+        try:
+            head, row_placeholders, tail = _split_values_clause(query)
+            chunk = max(1, min(chunk, _MAX_SQL_VARIABLES // max(1, row_placeholders.count("?"))))
+            full_count = len(rows) - len(rows) % chunk
+
+            affected_rows = 0
+            with self._acquire() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if full_count:
+                    batch_query = f"{head}VALUES {', '.join([row_placeholders] * chunk)}{tail}"
+                    for offset in range(0, full_count, chunk):
+                        params = [value for row in rows[offset:offset + chunk] for value in row]
+                        affected_rows += conn.execute(batch_query, params).rowcount
+                if full_count < len(rows):
+                    affected_rows += conn.executemany(query, rows[full_count:]).rowcount
+                conn.commit()
+                self._after_write(conn, affected_rows)
+
+            self._invalidate(query)
+            return affected_rows
+        except Exception as e:
+            logger.error(f"批量插入执行失败: {e}")
+            raise
+
     def build_query(self) -> QueryBuilder:
         """创建查询构建器"""
         return QueryBuilder()
 
     async def get_complex_application_report(self, days: int = 30) -> Dict:
-        """生成复杂的申请报告"""
+        """生成复杂的申请报告（结果缓存 _REPORT_CACHE_TTL 秒，相关表有写入时失效）"""
+        cache_key = ("report", days)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        # 基础统计
-        basic_stats = self.execute_query(
-            self.statistics.get_daily_application_stats(),
-            (start_date.isoformat(),)
-        )
-
-        # 公司统计
-        company_stats = self.execute_query(
-            self.statistics.get_company_application_stats(),
-            (start_date.isoformat(), 20)
-        )
-
-        # 成功率统计
-        success_rates = self.execute_query(
-            self.applications.get_success_rate_by_platform(),
-            (start_date.isoformat(),)
+        # 基础统计、公司统计、成功率统计互不依赖，并发查询，总耗时取决于最慢的一条
+        basic_stats, company_stats, success_rates = await asyncio.gather(
+            self.execute_query_async(
+                self.statistics.get_daily_application_stats(),
+                (start_date.isoformat(),)
+            ),
+            self.execute_query_async(
+                self.statistics.get_company_application_stats(),
+                (start_date.isoformat(), 20)
+            ),
+            self.execute_query_async(
+                self.applications.get_success_rate_by_platform(),
+                (start_date.isoformat(),)
+            )
         )
 
-        return {
+        report = {
             'period': f'{days} days',
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
@@ -499,6 +840,8 @@ class DatabaseQueries:
             'company_performance': company_stats,
             'platform_success_rates': success_rates
         }
+        self._cache_set(cache_key, report, _REPORT_CACHE_TTL, {"applications", "job_listings"})
+        return copy.deepcopy(report)
 
 if __name__ == "__main__":
     # 测试查询
@@ -6,47 +6,89 @@ import asyncio
 import logging
 import random
 from typing import Dict, Optional, List
-from playwright.async_api import Page, Browser, async_playwright
+from playwright.async_api import Page, Browser, BrowserContext, async_playwright
 
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 所有申请器实例共享同一个浏览器进程，每个职位只新建一个BrowserContext
+_playwright = None
+_browser: Optional[Browser] = None
+_browser_lock = asyncio.Lock()
+
+async def get_shared_browser(browser_config: Dict) -> Browser:
+    """获取共享浏览器实例（首次调用时启动，断开后自动重启）"""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(
+                headless=browser_config.get('headless', True),
+                slow_mo=browser_config.get('slow_mo', 500)
+            )
+            logger.info("Shared browser launched")
+        return _browser
+
+async def close_shared_browser():
+    """关闭共享浏览器和playwright（进程退出前调用）"""
+    global _playwright, _browser
+    async with _browser_lock:
+        try:
+            if _browser:
+                await _browser.close()
+            if _playwright:
+                await _playwright.stop()
+        except Exception as e:
+            logger.error(f"关闭共享浏览器失败: {e}")
+        finally:
+            _browser = None
+            _playwright = None
+
 class LinkedInApplier:
     """LinkedIn自动申请器"""
 
     def __init__(self, browser_config: Dict):
         self.config = browser_config
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.is_logged_in = False
 
     async def initialize(self):
-        """初始化浏览器"""
+        """获取共享浏览器"""
         try:
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.config.get('headless', True),
-                slow_mo=self.config.get('slow_mo', 500)
-            )
-
-            context = await self.browser.new_context(
-                viewport={
-                    'width': self.config.get('window_width', 1920),
-                    'height': self.config.get('window_height', 1080)
-                },
-                user_agent=self.config.get('user_agent')
-            )
-
-            self.page = await context.new_page()
-            self.page.set_default_timeout(self.config.get('page_timeout', 30000))
-
+            self.browser = await get_shared_browser(self.config)
             logger.info("LinkedIn applier initialized")
 
         except Exception as e:
             logger.error(f"初始化浏览器失败: {e}")
             raise
 
+    async def _open_page(self):
+        """为当前职位新建独立的浏览器上下文和页面"""
+        self.context = await self.browser.new_context(
+            viewport={
+                'width': self.config.get('window_width', 1920),
+                'height': self.config.get('window_height', 1080)
+            },
+            user_agent=self.config.get('user_agent')
+        )
+        self.page = await self.context.new_page()
+        self.page.set_default_timeout(self.config.get('page_timeout', 30000))
+
+    async def _close_page(self):
+        """关闭当前职位的浏览器上下文"""
+        try:
+            if self.context:
+                await self.context.close()
+        except Exception as e:
+            logger.error(f"关闭浏览器上下文失败: {e}")
+        finally:
+            self.context = None
+            self.page = None
+
     async def apply_to_job(self, job_url: str, cover_letter: str = "", custom_answers: Dict = None) -> Dict:
         """申请LinkedIn职位
 
@@ -58,17 +100,18 @@ class LinkedInApplier:
         Returns:
             申请结果
         """
-        if not self.page:
-            await self.initialize()
-
         if custom_answers is None:
             custom_answers = {}
 
         try:
+            if not self.browser or not self.browser.is_connected():
+                await self.initialize()
+            await self._open_page()
+
             logger.info(f"开始申请LinkedIn职位: {job_url}")
 
-            # 导航到职位页面
-            await self.page.goto(job_url, wait_until='networkidle')
+            # 导航到职位页面（networkidle会被LinkedIn的埋点请求拖住，DOM就绪即可）
+            await self.page.goto(job_url, wait_until='domcontentloaded')
 
             # 检查是否需要登录
             if await self._need_login():
@@ -123,6 +166,8 @@ class LinkedInApplier:
                 "status": "failed",
                 "message": f"申请过程中出错: {str(e)}"
             }
+        finally:
+            await self._close_page()
 
     async def _need_login(self) -> bool:
         """检查是否需要登录"""
@@ -377,16 +422,10 @@ class LinkedInApplier:
             return False
 
     async def close(self):
-        """关闭浏览器"""
-        try:
-            if self.browser:
-                await self.browser.close()
-            if hasattr(self, 'playwright'):
-                await self.playwright.stop()
-            logger.info("LinkedIn applier closed")
-
-        except Exception as e:
-            logger.error(f"关闭浏览器失败: {e}")
+        """释放本实例占用的上下文（共享浏览器由close_shared_browser关闭）"""
+        await self._close_page()
+        self.browser = None
+        logger.info("LinkedIn applier closed")
 
     async def __aenter__(self):
         """异步上下文管理器入口"""
@@ -415,4 +454,6 @@ if __name__ == "__main__":
             result = await applier.apply_to_job(test_url, cover_letter)
             print(f"申请结果: {result}")
 
+        await close_shared_browser()
+
     # asyncio.run(test_linkedin_applier())
\ No newline at end of file
@@ -9,7 +9,7 @@ import json
 import logging
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Mapping, Optional, Any
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -74,9 +74,8 @@ class JobApplierMCPServer:
                 else:
                     return [TextContent(type="text", text=f"不支持的平台: {platform}")]
 
-                # 保存职位信息到数据库
-                for job in results:
-                    await self.db_manager.save_job_listing(job)
+                # 保存职位信息到数据库（单个事务批量写入）
+                await self.db_manager.save_job_listings(results)
 
                 summary = f"在 {platform} 上找到 {len(results)} 个职位:\n\n"
                 for i, job in enumerate(results, 1):
@@ -123,9 +122,12 @@ class JobApplierMCPServer:
                 from src.ai.content_generator import ContentGenerator
 
                 generator = ContentGenerator(self.settings.ai)
-                cover_letter = await generator.generate_cover_letter(
-                    job_description, company_name, position_title, resume_summary
-                )
+                try:
+                    cover_letter = await generator.generate_cover_letter(
+                        job_description, company_name, position_title, resume_summary
+                    )
+                finally:
+                    await generator.aclose()
 
                 # 保存求职信
                 await self._save_cover_letter(company_name, position_title, cover_letter)
@@ -176,7 +178,8 @@ class JobApplierMCPServer:
                     platform="linkedin",
                     status=result.get('status', 'failed'),
                     cover_letter=cover_letter,
-                    notes=result.get('message', '')
+                    notes=result.get('message', ''),
+                    answers=answers_dict
                 )
 
                 return [TextContent(type="text", text=f"申请结果: {result}")]
@@ -315,7 +318,10 @@ class JobApplierMCPServer:
                 from src.ai.content_generator import ContentGenerator
 
                 generator = ContentGenerator(self.settings.ai)
-                optimized_content = await generator.optimize_keywords(content, job_posting, content_type)
+                try:
+                    optimized_content = await generator.optimize_keywords(content, job_posting, content_type)
+                finally:
+                    await generator.aclose()
 
                 result = f"🔍 **关键词优化完成**\n\n{optimized_content}"
                 return [TextContent(type="text", text=result)]
@@ -335,7 +341,10 @@ class JobApplierMCPServer:
                 from src.ai.content_generator import ContentGenerator
 
                 generator = ContentGenerator(self.settings.ai)
-                answers = await generator.generate_question_answers(questions, job_context, user_profile)
+                try:
+                    answers = await generator.generate_question_answers(questions, job_context, user_profile)
+                finally:
+                    await generator.aclose()
 
                 result = "❓ **申请问题智能回答**\n\n"
                 for i, (question, answer) in enumerate(zip(questions, answers), 1):
@@ -405,7 +414,7 @@ class JobApplierMCPServer:
         except Exception as e:
             logger.error(f"保存求职信失败: {str(e)}")
 
-    def _format_application_summary(self, applications: List[Dict]) -> str:
+    def _format_application_summary(self, applications: List[Mapping]) -> str:
         """格式化申请摘要"""
         if not applications:
             return "📊 暂无申请记录"
@@ -415,8 +424,8 @@ class JobApplierMCPServer:
         statuses = {}
 
         for app in applications:
-            platform = app.get('platform', 'unknown')
-            status = app.get('status', 'unknown')
+            platform = app['platform'] or 'unknown'
+            status = app['status'] or 'unknown'
 
             platforms[platform] = platforms.get(platform, 0) + 1
             statuses[status] = statuses.get(status, 0) + 1
@@ -462,6 +471,12 @@ class JobApplierMCPServer:
         except Exception as e:
             logger.error(f"服务器启动失败: {str(e)}")
             raise
+        finally:
+            await self.db_manager.close()
+            if 'src.utils.ai_common' in sys.modules:
+                await sys.modules['src.utils.ai_common'].close_shared_clients()
+            if 'src.platforms.linkedin.applier' in sys.modules:
+                await sys.modules['src.platforms.linkedin.applier'].close_shared_browser()
 
 if __name__ == "__main__":
     server = JobApplierMCPServer()
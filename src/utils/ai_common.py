@@ -0,0 +1,100 @@
+"""
+AI模块公共工具
+SDK延迟加载、共享客户端、进程级并发信号量和单词边界判断
+"""
+
+import asyncio
+import functools
+import importlib.util
+from typing import Dict, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+@functools.cache
+def anthropic_module():
+    """延迟导入anthropic SDK，首次导入后缓存模块"""
+    import anthropic
+    return anthropic
+
+@functools.cache
+def openai_module():
+    """延迟导入openai SDK，首次导入后缓存模块"""
+    import openai
+    return openai
+
+def _build_http_client():
+    """创建长连接复用的HTTP连接池（安装h2时启用HTTP/2）"""
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    )
+
+# 按 (提供商, API密钥, 重试次数) 共享的异步客户端，连接在整个进程内复用
+_shared_clients: Dict[Tuple[str, str, int], object] = {}
+
+def get_shared_client(provider: str, api_key: str, max_retries: int = 5):
+    """获取（首次调用时创建）共享的提供商异步客户端
+
+    Args:
+        provider: 'anthropic' 或 'openai'
+        api_key: API密钥
+        max_retries: SDK对429/5xx的最大重试次数（指数退避，遵循Retry-After）
+    """
+    key = (provider, api_key, max_retries)
+    client = _shared_clients.get(key)
+    if client is None:
+        if provider == 'anthropic':
+            client_cls = anthropic_module().AsyncAnthropic
+        else:
+            client_cls = openai_module().AsyncOpenAI
+        client = client_cls(
+            api_key=api_key,
+            http_client=_build_http_client(),
+            max_retries=max_retries
+        )
+        _shared_clients[key] = client
+    return client
+
+async def close_shared_clients():
+    """关闭所有共享客户端及其HTTP连接池（服务器退出时调用）"""
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.error(f"关闭AI客户端失败: {e}")
+
+# 按名称共享的进程级并发信号量
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def get_semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    """获取（首次调用时创建）名为name的并发信号量"""
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        semaphore = _semaphores[name] = asyncio.Semaphore(limit)
+    return semaphore
+
+def is_word_char(ch: str) -> bool:
+    """是否为单词字符（字母、数字或下划线）"""
+    return ch.isalnum() or ch == '_'
+
+def is_whole_word(text: str, start: int, end: int) -> bool:
+    """text[start:end] 两侧不是单词字符（避免 "Go" 命中 "Google"）"""
+    return (start == 0 or not is_word_char(text[start - 1])) and \
+        (end == len(text) or not is_word_char(text[end]))
+
+def find_word(text: str, word: str) -> int:
+    """完整单词word在text中首次出现的结束位置，未出现返回-1"""
+    start = text.find(word)
+    while start != -1:
+        end = start + len(word)
+        if is_whole_word(text, start, end):
+            return end
+        start = text.find(word, start + 1)
+    return -1